@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограмм длительности в миллисекундах;
+# последняя корзина - +Inf.
+DURATION_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500,
+                       5000)
+
+METRICS = {
+    'yamdb_http_requests_total': (
+        'counter', 'Запросы к приложению по маршруту, методу и статусу.',
+    ),
+    'yamdb_request_duration_seconds': (
+        'histogram', 'Время этапов запроса: db, serialize, render, total.',
+    ),
+    'yamdb_db_queries_total': (
+        'counter', 'SQL-запросы по маршруту.',
+    ),
+    'yamdb_cache_requests_total': (
+        'counter', 'Обращения к кешам API: hit или miss.',
+    ),
+    'yamdb_import_rows_total': (
+        'counter', 'Строки csv, обработанные importcsv.',
+    ),
+    'yamdb_emails_total': (
+        'counter', 'Письма: queued, sent или failed.',
+    ),
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    """Счётчики и гистограммы процесса.
+
+    Если задан METRICS_DIR, процесс не чаще раза в
+    METRICS_FLUSH_INTERVAL секунд сбрасывает свои значения в файл
+    <pid>.json этой папки, а /metrics складывает файлы всех процессов.
+    Так метрики не теряются между воркерами gunicorn и не требуют
+    внешних сервисов. Файлы завершившихся процессов остаются, чтобы
+    счётчики не уменьшались.
+
+    Сброс идёт под отдельной блокировкой через уникальный временный
+    файл; ошибки записи только логируются, чтобы не ломать запрос.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Очищает значения; вызывается и в дочернем процессе после fork."""
+        self.counters = {}
+        self.histograms = {}
+        self.flushed = 0.0
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self.flush()
+
+    def observe(self, name, duration_ms, labels=None):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': [0] * (len(DURATION_BUCKETS_MS) + 1),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            histogram['buckets'][
+                bisect_left(DURATION_BUCKETS_MS, duration_ms)
+            ] += 1
+            histogram['sum'] += duration_ms
+            histogram['count'] += 1
+        self.flush()
+
+    def snapshot(self):
+        """Значения процесса в виде, пригодном для json."""
+        with self.lock:
+            return {
+                'counters': [
+                    [name, labels, value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, labels, dict(histogram,
+                                        buckets=list(histogram['buckets']))]
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+
+    def flush(self, force=False):
+        """Сбрасывает значения процесса в METRICS_DIR."""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if directory is None:
+            return
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1)
+        # Запрос не ждёт чужой сброс: его значения попадут в следующий.
+        if not self.flush_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            if not force and now - self.flushed < interval:
+                return
+            self.flushed = now
+            self._write(Path(directory))
+        except Exception:
+            logger.exception('Не удалось сбросить метрики в %s', directory)
+        finally:
+            self.flush_lock.release()
+
+    def _write(self, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(self.snapshot())
+        fd, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f'{os.getpid()}.', suffix='.tmp',
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, directory / f'{os.getpid()}.json')
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def collect(self):
+        """Значения всех процессов: (счётчики, гистограммы)."""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if directory is None:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush(force=True)
+            snapshots = []
+            for path in Path(directory).glob('*.json'):
+                try:
+                    snapshots.append(json.loads(
+                        path.read_text(encoding='utf-8'),
+                    ))
+                except (OSError, ValueError):
+                    continue
+        counters = {}
+        histograms = {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot['counters']:
+                key = (name, _labels_key(dict(labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, histogram in snapshot['histograms']:
+                key = (name, _labels_key(dict(labels)))
+                total = histograms.setdefault(key, {
+                    'buckets': [0] * len(histogram['buckets']),
+                    'sum': 0.0,
+                    'count': 0,
+                })
+                total['buckets'] = [
+                    left + right for left, right
+                    in zip(total['buckets'], histogram['buckets'])
+                ]
+                total['sum'] += histogram['sum']
+                total['count'] += histogram['count']
+        return counters, histograms
+
+
+registry = MetricsRegistry()
+os.register_at_fork(after_in_child=registry.reset)
+
+
+def inc(name, labels=None, value=1):
+    """Увеличивает счётчик name с метками labels."""
+    registry.inc(name, labels, value)
+
+
+def observe(name, duration_ms, labels=None):
+    """Добавляет длительность в гистограмму name с метками labels."""
+    registry.observe(name, duration_ms, labels)
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for name, value in pairs
+    ) + '}'
+
+
+def render_metrics():
+    """Все метрики в текстовом формате Prometheus 0.0.4.
+
+    Гистограммы хранятся в миллисекундах, а отдаются в секундах,
+    как принято в Prometheus.
+    """
+    counters, histograms = registry.collect()
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+            continue
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            bounds = [bound / 1000 for bound in DURATION_BUCKETS_MS]
+            for bound, count in zip(bounds + ['+Inf'],
+                                    histogram['buckets']):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{_format_labels(labels, le=bound)} '
+                    f'{cumulative}',
+                )
+            lines.append(
+                f'{name}_sum{_format_labels(labels)} '
+                f'{histogram["sum"] / 1000}',
+            )
+            lines.append(
+                f'{name}_count{_format_labels(labels)} '
+                f'{histogram["count"]}',
+            )
+    return '\n'.join(lines) + '\n'
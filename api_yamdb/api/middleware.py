@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import time
+import traceback
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils import timezone
+
+from api import metrics, timing
+from api.timing import collect_timings, observe, record_query
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('api.slow_queries')
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос к API сделал больше SQL-запросов, чем позволяет вью."""
+
+
+def get_query_budget(view_func, method):
+    """Бюджет запросов вью для HTTP-метода или None, если его нет.
+
+    Бюджет задаётся атрибутом query_budget класса вью: числом для всех
+    действий или словарём {действие: число}. Действие viewset берётся
+    из привязки методов роутера, у APIView действием считается метод.
+    """
+    view_class = getattr(view_func, 'cls', None)
+    budget = getattr(view_class, 'query_budget', None)
+    if not isinstance(budget, dict):
+        return budget
+    actions = getattr(view_func, 'actions', None) or {}
+    return budget.get(actions.get(method.lower(), method.lower()))
+
+
+class QueryBudgetMiddleware:
+    """Проверяет, что запрос укладывается в бюджет SQL-запросов вью.
+
+    Бюджет не зависит от размера страницы: если число запросов растёт
+    вместе с limit, значит в вью или сериализаторе появился N+1.
+    Режим задаёт QUERY_BUDGET_MODE: 'raise' - исключение (для отладки
+    и тестов), 'log' - ошибка в лог, None - проверка отключена.
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, 'QUERY_BUDGET_MODE', None)
+        if self.mode is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+    def __call__(self, request):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and len(queries) > budget:
+            message = (
+                f'{request.method} {request.get_full_path()}: '
+                f'{len(queries)} SQL-запросов при бюджете {budget}.\n'
+                + '\n'.join(queries)
+            )
+            if self.mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.error(message)
+        return response
+
+
+def format_server_timing(timings):
+    """Значение заголовка Server-Timing в миллисекундах."""
+    metrics = []
+    for stage in ('db', 'serialize', 'render', 'total'):
+        if stage not in timings.durations:
+            continue
+        metric = f'{stage};dur={timings.durations[stage] * 1000:.2f}'
+        if stage == 'db':
+            metric += f';desc="{timings.queries} queries"'
+        metrics.append(metric)
+    return ', '.join(metrics)
+
+
+class ServerTimingMiddleware:
+    """Замеряет этапы запроса и отдаёт их в заголовке Server-Timing.
+
+    db - время запросов к базе (через connection.execute_wrapper),
+    serialize - сериализаторы с TimedSerializerMixin без времени базы,
+    render - отрисовка ответа, total - весь запрос. Этапы копятся
+    в гистограммах маршрута (api.timing.get_histograms), а запросы
+    считаются в yamdb_http_requests_total (см. api.metrics).
+    Отключается настройкой SERVER_TIMING = False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+        timings = request.timings
+
+        def finish_render(rendered):
+            timings.durations['render'] += time.perf_counter() - started
+
+        response.add_post_render_callback(finish_render)
+        return response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with collect_timings() as timings, connection.execute_wrapper(
+            record_query,
+        ):
+            request.timings = timings
+            response = self.get_response(request)
+        timings.durations['total'] = time.perf_counter() - started
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        observe(route, timings)
+        metrics.inc('yamdb_http_requests_total', {
+            'route': route,
+            'method': request.method,
+            'status': response.status_code,
+        })
+        response['Server-Timing'] = format_server_timing(timings)
+        return response
+
+
+def get_call_site(depth):
+    """Последние depth кадров стека из кода проекта.
+
+    Кадры django, DRF и других пакетов, а также обёрток
+    execute_wrapper отбрасываются: в логе остаются строки вью и сериализаторов,
+    из которых пришёл запрос.
+    """
+    base_dir = str(settings.BASE_DIR) + os.sep
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and frame.filename not in (__file__, timing.__file__)
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, base_dir)}:{frame.lineno} '
+        f'in {frame.name}'
+        for frame in frames[-depth:]
+    ]
+
+
+class SlowQueryMiddleware:
+    """Пишет SQL-запросы дольше SLOW_QUERY_MS в лог api.slow_queries.
+
+    Каждая запись - строка json: SQL, параметры, длительность в мс,
+    маршрут и метод запроса и SLOW_QUERY_STACK_DEPTH кадров стека
+    из кода проекта. Если SLOW_QUERY_MS = None, middleware не
+    подключается и не замедляет запросы.
+    """
+
+    def __init__(self, get_response):
+        self.threshold = getattr(settings, 'SLOW_QUERY_MS', None)
+        if self.threshold is None:
+            raise MiddlewareNotUsed
+        self.depth = getattr(settings, 'SLOW_QUERY_STACK_DEPTH', 5)
+        self.get_response = get_response
+
+    def __call__(self, request):
+
+        def log_slow_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = (time.perf_counter() - started) * 1000
+                if duration >= self.threshold:
+                    match = request.resolver_match
+                    slow_query_logger.warning(json.dumps({
+                        'time': timezone.now().isoformat(),
+                        'duration_ms': round(duration, 3),
+                        'sql': sql,
+                        'params': params,
+                        'many': many,
+                        'view': match.view_name if match else None,
+                        'method': request.method,
+                        'path': request.path,
+                        'stack': get_call_site(self.depth),
+                    }, ensure_ascii=False, default=str))
+
+        with connection.execute_wrapper(log_slow_query):
+            return self.get_response(request)
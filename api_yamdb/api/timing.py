@@ -0,0 +1,124 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from api import metrics
+
+BUCKETS_MS = metrics.DURATION_BUCKETS_MS
+STAGES_METRIC = 'yamdb_request_duration_seconds'
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Время этапов одного запроса в секундах."""
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.queries = 0
+        self._active = set()
+
+    def add_query(self, duration):
+        self.durations['db'] += duration
+        self.queries += 1
+
+
+@contextmanager
+def collect_timings():
+    """Делает RequestTimings текущим для кода внутри блока."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """Добавляет время блока к этапу name текущего запроса.
+
+    Время запросов к базе внутри блока вычитается: оно уже учтено
+    в этапе db. Вложенные блоки с тем же именем не считаются
+    повторно, поэтому вложенные сериализаторы не удваивают время.
+    Вне запроса блок ничего не делает.
+    """
+    timings = _current.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+    timings._active.add(name)
+    db_before = timings.durations['db']
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[name] += (
+            time.perf_counter() - started
+            - (timings.durations['db'] - db_before)
+        )
+        timings._active.discard(name)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка execute_wrapper: время запроса к базе."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(time.perf_counter() - started)
+
+
+def observe(route, timings):
+    """Добавляет этапы и число SQL-запросов в метрики маршрута."""
+    for stage, duration in timings.durations.items():
+        metrics.observe(
+            STAGES_METRIC, duration * 1000, {'route': route, 'stage': stage},
+        )
+    if timings.queries:
+        metrics.inc(
+            'yamdb_db_queries_total', {'route': route}, timings.queries,
+        )
+
+
+def get_histograms():
+    """Снимок гистограмм процесса.
+
+    {(маршрут, этап): (корзины, сумма в мс, количество)}.
+    """
+    registry = metrics.registry
+    histograms = {}
+    with registry.lock:
+        for (name, labels), histogram in registry.histograms.items():
+            if name != STAGES_METRIC:
+                continue
+            labels = dict(labels)
+            histograms[(labels['route'], labels['stage'])] = (
+                list(histogram['buckets']), histogram['sum'],
+                histogram['count'],
+            )
+    return histograms
+
+
+def reset_histograms():
+    registry = metrics.registry
+    with registry.lock:
+        for key in [key for key in registry.histograms
+                    if key[0] == STAGES_METRIC]:
+            del registry.histograms[key]
+
+
+class TimedSerializerMixin:
+    """Миксин сериализатора: время (де)сериализации идёт в этап serialize."""
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+    def run_validation(self, *args, **kwargs):
+        with timed('serialize'):
+            return super().run_validation(*args, **kwargs)
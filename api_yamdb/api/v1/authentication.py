@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import metrics
+from user.models import User, UserRole
+
+
+def get_access_token(user):
+    """Access-токен с ролью и признаком администратора."""
+    token = AccessToken.for_user(user)
+    token['role'] = user.role
+    token['is_admin'] = user.is_admin
+    return token
+
+
+class TokenUser(SimpleLazyObject):
+    """Пользователь, собранный из claims access-токена.
+
+    id, role, is_admin и is_moderator берутся из токена, поэтому
+    проверка прав не обращается к базе. Строка User загружается
+    при первом обращении к любому другому атрибуту, например
+    при сохранении отзыва с author=request.user. username в токен
+    не попадает: его можно сменить через /users/me/.
+    В старых токенах без claims нужные поля тоже берутся из строки.
+    Смена роли вступает в силу с новым токеном.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.__dict__['token'] = token
+        super().__init__(self._load_user)
+
+    def _load_user(self):
+        try:
+            user = User.objects.get(pk=self.pk)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found',
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive',
+            )
+        return user
+
+    def _claim(self, name):
+        if name in self.token:
+            return self.token[name]
+        if self._wrapped is empty:
+            self._setup()
+        return getattr(self._wrapped, name)
+
+    @property
+    def pk(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    id = pk
+
+    @property
+    def role(self):
+        return self._claim('role')
+
+    @property
+    def is_admin(self):
+        return self._claim('is_admin')
+
+    @property
+    def is_moderator(self):
+        return self.role == UserRole.MODERATOR
+
+    def __eq__(self, other):
+        if isinstance(other, (User, TokenUser)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __bool__(self):
+        return True
+
+
+class TokenCache:
+    """LRU-кеш проверенных access-токенов процесса.
+
+    Ключ - токен из заголовка, значение - проверенный токен с claims.
+    Запись живёт до exp токена, размер ограничен TOKEN_CACHE_SIZE:
+    при переполнении вытесняется давно не использованный токен.
+    TOKEN_CACHE_SIZE = 0 отключает кеш.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = OrderedDict()
+
+    @property
+    def size(self):
+        return getattr(settings, 'TOKEN_CACHE_SIZE', 0)
+
+    def get(self, raw_token):
+        with self.lock:
+            entry = self.tokens.get(raw_token)
+            if entry is None:
+                return None
+            token, expires = entry
+            if expires <= time.time():
+                del self.tokens[raw_token]
+                return None
+            self.tokens.move_to_end(raw_token)
+            return token
+
+    def set(self, raw_token, token):
+        with self.lock:
+            self.tokens[raw_token] = (token, token['exp'])
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > self.size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+token_cache = TokenCache()
+
+
+class YamdbJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя к базе.
+
+    Проверенные токены берутся из token_cache, поэтому подпись
+    и claims повторяющегося токена проверяются один раз.
+    """
+
+    def get_validated_token(self, raw_token):
+        if not token_cache.size:
+            return super().get_validated_token(raw_token)
+        token = token_cache.get(raw_token)
+        metrics.inc('yamdb_cache_requests_total', {
+            'cache': 'token', 'result': 'miss' if token is None else 'hit',
+        })
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Токен не содержит id пользователя.')
+        return TokenUser(validated_token)
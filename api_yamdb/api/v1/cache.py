@@ -0,0 +1,101 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from api import metrics
+
+VERSION_KEY = 'api:version:{}'
+RESPONSE_KEY = 'api:response:{}'
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def _initial_version():
+    """Начальная версия модели.
+
+    Берётся от времени, а не с единицы: если ключ версии вытеснен
+    из кэша, новая версия не совпадёт ни с одной из прежних
+    и старые ответы не будут отданы повторно.
+    """
+    return time.time_ns()
+
+
+def get_versions(models):
+    """Возвращает текущие версии моделей, создавая недостающие."""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """Сдвигает версию модели, делая недействительными её ответы."""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def bump_version_on_commit(model):
+    """Сдвигает версию модели после фиксации текущей транзакции.
+
+    Если сдвинуть раньше, параллельный читатель успеет взять новую
+    версию, прочитать ещё старые строки и сохранить их под новым
+    ключом до следующей записи. Вне транзакции сдвигает сразу.
+    """
+    transaction.on_commit(lambda: bump_version(model))
+
+
+class CachedListMixin:
+    """Кэширует данные ответа list() с точной инвалидацией.
+
+    Ключ строится из схемы, хоста, пути, параметров запроса и версий
+    моделей из cache_dependencies: ссылки next и previous в данных
+    абсолютные, и ответ для одного хоста не годится для другого.
+    Любая запись в эти модели сдвигает версию (см. api.v1.receivers),
+    поэтому старые ответы просто перестают находиться и вытесняются
+    бэкендом кэша.
+    В кэше лежат данные, а не отрисованный ответ: формат
+    по-прежнему выбирается для каждого запроса.
+    """
+
+    cache_dependencies = ()
+
+    def get_cache_key(self, request):
+        query = sorted(request.query_params.lists())
+        versions = get_versions(self.cache_dependencies)
+        raw = (
+            f'{request.scheme}://{request.get_host()}{request.path}'
+            f'|{query}|{versions}'
+        )
+        return RESPONSE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+    def cached_response(self, request, build_response):
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        metrics.inc('yamdb_cache_requests_total', {
+            'cache': 'response', 'result': 'miss' if data is None else 'hit',
+        })
+        if data is not None:
+            return Response(data)
+        response = build_response()
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs,
+            ),
+        )
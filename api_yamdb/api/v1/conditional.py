@@ -0,0 +1,75 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from api import metrics
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list/retrieve без сериализации ответа.
+
+    Состояние выборки — количество строк и наибольшая дата изменения:
+    создание и правка сдвигают дату, удаление меняет количество.
+    Last-Modified у списка удаление не отразило бы, и клиент с одним
+    If-Modified-Since получал бы 304 и после него, поэтому список
+    отдаёт только ETag, а Last-Modified — только объект.
+    Связанные строки в состояние не входят: при смене имени автора
+    его отзывы и комментарии сдвигают дату сами (reviews.receivers).
+    """
+
+    last_modified_field = 'updated'
+
+    def get_etag(self, request, state):
+        raw = (
+            f'{request.get_full_path()}|{request.accepted_media_type}|'
+            f'{state}'
+        )
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def conditional_response(self, request, state, last_modified,
+                             build_response):
+        etag = self.get_etag(request, state)
+        timestamp = last_modified and timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp,
+        )
+        metrics.inc('yamdb_cache_requests_total', {
+            'cache': 'conditional', 'result': 'miss' if response is None
+            else 'hit',
+        })
+        if response is None:
+            response = build_response()
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if timestamp:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        state = self.filter_queryset(self.get_queryset()).aggregate(
+            count=Count('pk'),
+            last_modified=Max(self.last_modified_field),
+        )
+        return self.conditional_response(
+            request,
+            (state['count'], state['last_modified']),
+            None,
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs,
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = getattr(instance, self.last_modified_field)
+        return self.conditional_response(
+            request,
+            (instance.pk, last_modified),
+            last_modified,
+            lambda: Response(self.get_serializer(instance).data),
+        )
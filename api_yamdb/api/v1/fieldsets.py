@@ -0,0 +1,73 @@
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _param_set(request, param):
+    return {
+        name.strip()
+        for name in request.query_params.get(param, '').split(',')
+        if name.strip()
+    }
+
+
+def is_field_requested(request, name):
+    """Нужно ли поле в ответе с учётом ?fields= и ?omit=.
+
+    Урезаются только ответы на безопасные запросы: при записи
+    сериализатору нужны все поля.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return True
+    fields = _param_set(request, FIELDS_PARAM)
+    if fields and name not in fields:
+        return False
+    return name not in _param_set(request, OMIT_PARAM)
+
+
+class SparseFieldsSerializerMixin:
+    """Убирает из сериализатора поля, не запрошенные клиентом."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        for name in tuple(self.fields):
+            if not is_field_requested(request, name):
+                self.fields.pop(name)
+
+
+class SparseFieldsViewMixin:
+    """Урезает запрос к базе вслед за полями ответа.
+
+    Связи из select_related_fields и prefetch_related_fields
+    подгружаются, только если соответствующее поле сериализатора
+    запрошено, а поля из deferrable_fields иначе откладываются
+    через defer(). Имена совпадают с полями сериализатора.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    deferrable_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        select = [
+            name for name in self.select_related_fields
+            if is_field_requested(self.request, name)
+        ]
+        if select:
+            queryset = queryset.select_related(*select)
+        prefetch = [
+            name for name in self.prefetch_related_fields
+            if is_field_requested(self.request, name)
+        ]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        deferred = [
+            name for name in self.deferrable_fields
+            if not is_field_requested(self.request, name)
+        ]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
@@ -1,6 +1,7 @@
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import build_search_query, title_search_available
 
 
 class TitleFilter(filters.FilterSet):
@@ -9,7 +10,22 @@ class TitleFilter(filters.FilterSet):
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
     genre = filters.CharFilter(field_name='genre__slug')
     category = filters.CharFilter(field_name='category__slug')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ('name', 'genre', 'category', 'year')
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию.
+
+        Результаты упорядочены по релевантности (bm25).
+        """
+        query = build_search_query(value)
+        if query is None:
+            return queryset.none()
+        if not title_search_available(queryset.db):
+            return queryset.filter(name__icontains=value)
+        return queryset.filter(search__query=query).order_by(
+            'search__rank', 'name',
+        )
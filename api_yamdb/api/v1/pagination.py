@@ -0,0 +1,191 @@
+import json
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import connections
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    LimitOffsetPagination,
+)
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация: страница N стоит столько же, сколько первая.
+
+    CursorPagination из DRF фильтрует только по первому полю порядка,
+    а строки с одинаковым значением пропускает смещением — при многих
+    одинаковых именах страница снова читает их с начала. Здесь курсор
+    хранит значения всех полей порядка, и страница выбирается
+    сравнением строк значений (a, b) > (x, y) — диапазоном индекса
+    по (a, b), а не просмотром всего, что лежит до курсора.
+    Последнее поле порядка должно быть уникальным, поля — не NULL
+    и упорядочены в одну сторону.
+
+    Размер страницы задаётся тем же параметром limit,
+    что и у LimitOffsetPagination.
+    """
+
+    page_size_query_param = 'limit'
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if isinstance(instance, dict):
+                values.append(instance[name])
+            else:
+                values.append(getattr(instance, name))
+        # str(), а не DjangoJSONEncoder: тот обрезает микросекунды.
+        return json.dumps(values, default=str)
+
+    def filter_after_position(self, queryset, position, reverse):
+        """Строки после позиции курсора: (a, b) > (x, y).
+
+        Сравнение строк значений, а не a > x OR (a = x AND b > y):
+        для OR с ORDER BY ... LIMIT SQLite выбирает просмотр индекса
+        с начала, и глубокие страницы дорожают. Если последнее поле —
+        id (rowid), SQLite 3.40 ищет только по первому полю и
+        пропускает строки с тем же значением, но не зависит от глубины.
+        Все поля порядка должны идти в одну сторону.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(
+            self.ordering,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        descending = {field.startswith('-') for field in self.ordering}
+        if len(descending) != 1:
+            raise ImproperlyConfigured(
+                'Поля порядка курсора должны идти в одну сторону.',
+            )
+        connection = connections[queryset.db]
+        quote = connection.ops.quote_name
+        opts = queryset.model._meta
+        table = quote(opts.db_table)
+        columns, params = [], []
+        for field, value in zip(self.ordering, values):
+            model_field = opts.get_field(field.lstrip('-'))
+            columns.append(f'{table}.{quote(model_field.column)}')
+            params.append(model_field.get_db_prep_value(
+                model_field.to_python(value), connection,
+            ))
+        operator = '<' if descending.pop() != reverse else '>'
+        placeholders = ', '.join(['%s'] * len(params))
+        return queryset.extra(
+            where=[f'({", ".join(columns)}) {operator} ({placeholders})'],
+            params=params,
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """То же, что в CursorPagination, но с фильтром по всем полям.
+
+        Позиции уникальны, поэтому смещение в курсоре всегда нулевое.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            try:
+                queryset = self.filter_after_position(
+                    queryset, current_position, reverse,
+                )
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering,
+            )
+        moved = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next = moved
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = moved
+            self.next_position = following_position
+            self.previous_position = current_position
+        if (self.has_previous or self.has_next) and self.template:
+            self.display_page_controls = True
+        return self.page
+
+
+class LimitOffsetOrCursorPagination(BasePagination):
+    """Пагинация limit/offset с опциональным курсорным режимом.
+
+    Курсорный режим включается параметром ?cursor= (первая страница —
+    пустой курсор), дальше клиент идёт по ссылкам next/previous.
+    Порядок курсора задаётся в cursor_ordering наследника и должен
+    совпадать с составным индексом модели.
+    """
+
+    cursor_ordering = None
+
+    def __init__(self):
+        self.limit_offset = LimitOffsetPagination()
+        self.cursor = KeysetPagination()
+        self.cursor.ordering = self.cursor_ordering
+        self.paginator = self.limit_offset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor.cursor_query_param in request.query_params:
+            self.paginator = self.cursor
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.limit_offset.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_fields(self, view):
+        return (
+            self.limit_offset.get_schema_fields(view)
+            + self.cursor.get_schema_fields(view)[:1]
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.limit_offset.get_schema_operation_parameters(view)
+            + self.cursor.get_schema_operation_parameters(view)[:1]
+        )
+
+
+class TitlePagination(LimitOffsetOrCursorPagination):
+    """Пагинация тайтлов, курсор по имени и id."""
+
+    cursor_ordering = ('name', 'id')
+
+
+class PubDatePagination(LimitOffsetOrCursorPagination):
+    """Пагинация отзывов и комментариев, курсор по дате публикации."""
+
+    cursor_ordering = ('-pub_date', '-id')
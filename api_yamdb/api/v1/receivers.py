@@ -0,0 +1,30 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.v1.cache import bump_version_on_commit
+from reviews.models import Category, Genre, Title
+from reviews.signals import title_score_changed
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def catalogue_changed(sender, **kwargs):
+    """Инвалидирует кэш списков при изменении каталога."""
+    bump_version_on_commit(sender)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    """Инвалидирует кэш тайтлов при изменении их жанров."""
+    if action.startswith('post_'):
+        bump_version_on_commit(Title)
+
+
+@receiver(title_score_changed)
+def title_rating_changed(sender, **kwargs):
+    """Инвалидирует кэш тайтлов при изменении рейтинга."""
+    bump_version_on_commit(Title)
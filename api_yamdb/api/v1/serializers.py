@@ -1,15 +1,20 @@
 import re
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from api.timing import TimedSerializerMixin
+from api.v1.authentication import get_access_token
+from api.v1.fieldsets import SparseFieldsSerializerMixin
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from user.models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin,
+                     SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     """Сериализатор модели User."""
 
     class Meta:
@@ -30,7 +35,8 @@ class UsersMeSerializer(UserSerializer):
     role = serializers.CharField(read_only=True)
 
 
-class YamdbTokenObtainPairSerializer(serializers.Serializer):
+class YamdbTokenObtainPairSerializer(TimedSerializerMixin,
+                                     serializers.Serializer):
     """Сериализатор получения токена."""
 
     username = serializers.CharField(max_length=150)
@@ -40,10 +46,11 @@ class YamdbTokenObtainPairSerializer(serializers.Serializer):
         user = get_object_or_404(User, username=data.get('username'))
         if user.confirmation_code != data.get('confirmation_code'):
             raise serializers.ValidationError('Не верный confirmation_code')
-        return {'access': str(AccessToken.for_user(user))}
+        return {'access': str(get_access_token(user))}
 
 
-class SignupSerializer(serializers.ModelSerializer):
+class SignupSerializer(TimedSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериализатор для регистрации пользователей."""
 
     def validate_username(self, value):
@@ -58,7 +65,9 @@ class SignupSerializer(serializers.ModelSerializer):
         model = User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin,
+                         SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериализатор модели Category."""
 
     def validate_slug(self, value):
@@ -75,7 +84,9 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin,
+                      SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Сериализатор модели Genre."""
 
     def validate_slug(self, value):
@@ -92,7 +103,9 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedSerializerMixin,
+                      SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Базовый сериализатор модели Title."""
 
     rating = serializers.IntegerField(read_only=True)
@@ -141,7 +154,177 @@ class TitleWriteSerializer(TitleSerializer):
     )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleStatsSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    """Сериализатор статистики оценок тайтла."""
+
+    score_histogram = serializers.ListField(read_only=True)
+
+    class Meta:
+        model = Title
+        fields = (
+            'id',
+            'rating',
+            'score_count',
+            'score_histogram',
+        )
+
+
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """Пакетное создание и обновление тайтлов.
+
+    Слаги категорий и жанров, а также id обновляемых тайтлов
+    проверяются одним запросом на каждую модель для всего пакета.
+    Ошибки возвращаются списком, по одному элементу на тайтл.
+
+    При обновлении name и genre обязательны, а не переданные year,
+    description и category сохраняют текущие значения: они берутся
+    из того же запроса, которым проверяются id.
+    """
+
+    optional_fields = ('year', 'description', 'category')
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > settings.TITLES_BULK_LIMIT:
+            raise serializers.ValidationError({
+                'non_field_errors': [
+                    'За один запрос можно передать не больше '
+                    f'{settings.TITLES_BULK_LIMIT} произведений',
+                ],
+            })
+        items = super().to_internal_value(data)
+        self.existing = {
+            title_id: dict(zip(('rating',) + self.optional_fields, values))
+            for title_id, *values in Title.objects.filter(
+                id__in={item['id'] for item in items if 'id' in item},
+            ).values_list(
+                'id', 'rating', 'year', 'description', 'category__slug',
+            )
+        }
+        for item in items:
+            current = self.existing.get(item.get('id'))
+            if current is None:
+                continue
+            for field in self.optional_fields:
+                item.setdefault(field, current[field])
+        self.category_ids = dict(
+            Category.objects.filter(
+                slug__in={item['category'] for item in items
+                          if item.get('category')},
+            ).values_list('slug', 'id'),
+        )
+        self.genre_ids = dict(
+            Genre.objects.filter(
+                slug__in={slug for item in items for slug in item['genre']},
+            ).values_list('slug', 'id'),
+        )
+        errors = [self._relation_errors(item) for item in items]
+        seen_ids = set()
+        for item, item_errors in zip(items, errors):
+            if 'id' not in item:
+                continue
+            if item['id'] in seen_ids:
+                item_errors['id'] = ['Произведение указано в пакете дважды']
+            seen_ids.add(item['id'])
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def _relation_errors(self, item):
+        errors = {}
+        category = item.get('category')
+        if category and category not in self.category_ids:
+            errors['category'] = [f'Категория {category} не найдена']
+        unknown_genres = [
+            slug for slug in item['genre'] if slug not in self.genre_ids
+        ]
+        if unknown_genres:
+            errors['genre'] = [
+                f'Жанр {slug} не найден' for slug in unknown_genres
+            ]
+        if 'id' in item and item['id'] not in self.existing:
+            errors['id'] = [f'Произведение {item["id"]} не найдено']
+        return errors
+
+    def _build_title(self, item):
+        return Title(
+            id=item.get('id'),
+            name=item['name'],
+            year=item.get('year'),
+            description=item.get('description'),
+            category_id=self.category_ids.get(item.get('category')),
+        )
+
+    def create(self, validated_data):
+        batch_size = settings.TITLES_BULK_BATCH_SIZE
+        new_titles = [
+            self._build_title(item)
+            for item in validated_data if 'id' not in item
+        ]
+        Title.objects.bulk_create(new_titles, batch_size=batch_size)
+        if new_titles and new_titles[0].pk is None:
+            # SQLite в Django 3.2 не возвращает id из bulk_create.
+            # Пока транзакция держит блокировку записи, последние
+            # строки таблицы — только что вставленные, по порядку.
+            ids = Title.objects.order_by('-id').values_list(
+                'id', flat=True,
+            )[:len(new_titles)]
+            for title, pk in zip(new_titles, reversed(ids)):
+                title.pk = pk
+
+        old_titles = [
+            self._build_title(item)
+            for item in validated_data if 'id' in item
+        ]
+        Title.objects.bulk_update(
+            old_titles,
+            ('name', 'year', 'description', 'category'),
+            batch_size=batch_size,
+        )
+        GenreTitle.objects.filter(
+            title_id__in=[title.pk for title in old_titles],
+        ).delete()
+
+        new_titles = iter(new_titles)
+        result = []
+        for item in validated_data:
+            title_id = item.get('id') or next(new_titles).pk
+            result.append({
+                **item,
+                'id': title_id,
+                'rating': self.existing.get(title_id, {}).get('rating'),
+            })
+        GenreTitle.objects.bulk_create(
+            (
+                GenreTitle(title_id=item['id'], genre_id=self.genre_ids[slug])
+                for item in result
+                for slug in dict.fromkeys(item['genre'])
+            ),
+            batch_size=batch_size,
+        )
+        return result
+
+
+class TitleBulkSerializer(TitleSerializer):
+    """Сериализатор одного тайтла в пакетной загрузке."""
+
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=50),
+    )
+    category = serializers.SlugField(
+        max_length=50,
+        required=False,
+        allow_null=True,
+    )
+
+    class Meta(TitleSerializer.Meta):
+        list_serializer_class = TitleBulkListSerializer
+
+
+class ReviewSerializer(TimedSerializerMixin,
+                       SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериализатор для модели Review."""
 
     author = serializers.StringRelatedField(read_only=True)
@@ -181,7 +364,9 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin,
+                        SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для модели Comment."""
 
     author = serializers.SlugRelatedField(
@@ -1,8 +1,8 @@
-from django.core.mail import send_mail
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.utils.crypto import get_random_string
 
-from user.models import User
+from api import metrics
+from user.models import OutgoingEmail
 
 
 def get_confirmation_code():
@@ -11,17 +11,21 @@ def get_confirmation_code():
     return get_random_string(20, chars)
 
 
-def send_confirmation_code(request):
-    """Отправляет сгенерированный confirmation_code пользователю."""
-    user = get_object_or_404(
-        User,
-        username=request.data.get('username'),
-    )
+def send_confirmation_code(user):
+    """Ставит письмо с новым confirmation_code в очередь.
+
+    Пользователь сохраняется вместе с письмом; нового пользователя
+    можно передать несохранённым, тогда он создаётся сразу с кодом.
+    Письмо отправит команда sendemails, поэтому запрос не ждёт
+    почтовый сервер.
+    """
     user.confirmation_code = get_confirmation_code()
-    user.save()
-    send_mail(
-        'данные для получеия токена',
-        f'Код подтверждения {user.confirmation_code}',
-        'token@yamdb.ru',
-        [request.data.get('email')],
-    )
+    with transaction.atomic():
+        user.save()
+        OutgoingEmail.objects.create(
+            subject='данные для получеия токена',
+            body=f'Код подтверждения {user.confirmation_code}',
+            from_email='token@yamdb.ru',
+            to=user.email,
+        )
+    metrics.inc('yamdb_emails_total', {'result': 'queued'})
@@ -1,7 +1,9 @@
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import (
     SAFE_METHODS,
     AllowAny,
@@ -13,7 +15,11 @@ from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from api.v1.cache import CachedListMixin, bump_version_on_commit
+from api.v1.conditional import ConditionalGetMixin
+from api.v1.fieldsets import SparseFieldsViewMixin
 from api.v1.filters import TitleFilter
+from api.v1.pagination import PubDatePagination, TitlePagination
 from api.v1.permissions import (
     IsAdminOrReadOnly,
     IsAdminUser,
@@ -25,14 +31,16 @@ from api.v1.serializers import (
     GenreSerializer,
     ReviewSerializer,
     SignupSerializer,
+    TitleBulkSerializer,
     TitleReadSerializer,
+    TitleStatsSerializer,
     TitleWriteSerializer,
     UserSerializer,
     UsersMeSerializer,
     YamdbTokenObtainPairSerializer,
 )
 from api.v1.utils import send_confirmation_code
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from user.models import User
 
 
@@ -54,13 +62,13 @@ class UsersMeView(APIView):
 
     def get(self, request):
         """Метод GET."""
-        me = get_object_or_404(User, username=request.user.username)
+        me = get_object_or_404(User, pk=request.user.pk)
         serializer = UserSerializer(me)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def patch(self, request):
         """Метод PATCH."""
-        me = get_object_or_404(User, username=request.user.username)
+        me = get_object_or_404(User, pk=request.user.pk)
         serializer = UsersMeSerializer(me, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -81,17 +89,18 @@ class SignupView(APIView):
     def post(self, request):
         """Метод POST."""
         serializer = SignupSerializer(data=request.data)
-        if User.objects.filter(username=request.data.get('username'),
-                               email=request.data.get('email')).exists():
-            send_confirmation_code(request)
+        user = User.objects.filter(username=request.data.get('username'),
+                                   email=request.data.get('email')).first()
+        if user is not None:
+            send_confirmation_code(user)
             return Response(request.data, status=status.HTTP_200_OK)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        send_confirmation_code(request)
+        send_confirmation_code(User(**serializer.validated_data))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CreateListDestroyViewSet(mixins.CreateModelMixin,
+class CreateListDestroyViewSet(CachedListMixin,
+                               mixins.CreateModelMixin,
                                mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
@@ -107,6 +116,7 @@ class CategoryViewSet(CreateListDestroyViewSet):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_dependencies = (Category,)
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAdminOrReadOnly,
@@ -118,20 +128,28 @@ class GenreViewSet(CreateListDestroyViewSet):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_dependencies = (Genre,)
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAdminOrReadOnly,
     )
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedListMixin,
+                   SparseFieldsViewMixin,
+                   viewsets.ModelViewSet):
     """Вьюсет для модели Title."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score'),
-    ).order_by('name')
+    queryset = Title.objects.order_by('name')
+    select_related_fields = ('category',)
+    prefetch_related_fields = ('genre',)
+    deferrable_fields = ('description',)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
+    cache_dependencies = (Title, Genre, Category)
+    # Запись не ограничена: жанры ищутся по слагу каждый отдельно.
+    query_budget = {'list': 4, 'retrieve': 3, 'facets': 5, 'stats': 2}
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAdminOrReadOnly,
@@ -142,48 +160,151 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, methods=('post',))
+    def bulk(self, request):
+        """Пакетное создание и обновление тайтлов.
 
-class ReviewViewSet(viewsets.ModelViewSet):
+        Элементы с id обновляются, без id — создаются. Не переданные
+        при обновлении year, description и category не меняются.
+        Пакет сохраняется целиком в одной транзакции или не сохраняется
+        вовсе, ошибки возвращаются по каждому элементу.
+        """
+        serializer = TitleBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+            bump_version_on_commit(Title)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=('get',))
+    def stats(self, request, pk=None):
+        """Рейтинг и распределение оценок тайтла одним чтением строки."""
+        title = get_object_or_404(Title, pk=pk)
+        return Response(TitleStatsSerializer(title).data)
+
+    @action(detail=False, methods=('get',))
+    def facets(self, request):
+        """Количество тайтлов по жанрам, категориям и годам.
+
+        Принимает те же параметры, что и список тайтлов.
+        Каждый фасет считается одним GROUP BY-запросом.
+        """
+        return self.cached_response(request, self._build_facets)
+
+    def _build_facets(self):
+        title_ids = self.filter_queryset(self.get_queryset()).values('pk')
+        titles = Title.objects.filter(pk__in=title_ids).order_by()
+        genres = (
+            GenreTitle.objects.filter(title__in=title_ids, genre__isnull=False)
+            .values('genre__slug')
+            .annotate(count=Count('id'))
+            .order_by('genre__slug')
+        )
+        categories = (
+            titles.values('category__slug')
+            .annotate(count=Count('id'))
+            .order_by('category__slug')
+        )
+        years = titles.values('year').annotate(count=Count('id')).order_by(
+            'year',
+        )
+        return Response({
+            'count': titles.count(),
+            'genre': [
+                {'slug': row['genre__slug'], 'count': row['count']}
+                for row in genres
+            ],
+            'category': [
+                {'slug': row['category__slug'], 'count': row['count']}
+                for row in categories
+            ],
+            'year': list(years),
+        })
+
+
+class ReviewViewSet(ConditionalGetMixin,
+                    SparseFieldsViewMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для модели Review."""
 
     serializer_class = ReviewSerializer
+    pagination_class = PubDatePagination
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorOrModerAdminPermission,
     )
-
+    select_related_fields = ('author',)
+    deferrable_fields = ('text',)
+    query_budget = {
+        'list': 5, 'retrieve': 3, 'create': 6,
+        'update': 6, 'partial_update': 6, 'destroy': 7,
+    }
+
+    def get_title(self):
+        """Тайтл из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id'),
+            )
+        return self._title
+
+    # Счётчики оценок тайтла сдвигают обработчики post_save
+    # и post_delete отзыва (reviews.receivers); транзакция держит
+    # отзыв и счётчики согласованными.
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        with transaction.atomic():
+            serializer.save(author=self.request.user, title=self.get_title())
+
+    # Правка и удаление целиком идут в транзакции: get_object() читает
+    # старую оценку в ней же, под блокировкой строки. Иначе две
+    # параллельные правки вычли бы из счётчиков одну и ту же оценку.
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        queryset = self.get_title().reviews.all()
+        if self.action in ('update', 'partial_update', 'destroy'):
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin,
+                     SparseFieldsViewMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для модели Comment."""
 
     serializer_class = CommentSerializer
+    pagination_class = PubDatePagination
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorOrModerAdminPermission,
     )
+    select_related_fields = ('author',)
+    deferrable_fields = ('text',)
+    query_budget = {
+        'list': 5, 'retrieve': 3, 'create': 3,
+        'update': 4, 'partial_update': 4, 'destroy': 4,
+    }
+
+    def get_review(self):
+        """Отзыв из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def perform_create(self, serializer):
         """Создание нового коммента."""
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
     def get_queryset(self):
         """Получение кверисета."""
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title)
-        return Comment.objects.filter(review=review)
+        return Comment.objects.filter(review=self.get_review())
@@ -0,0 +1,12 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from api.metrics import render_metrics
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics_view(request):
+    """Метрики всех воркеров в текстовом формате Prometheus."""
+    return HttpResponse(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
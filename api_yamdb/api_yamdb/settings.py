@@ -26,6 +26,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ServerTimingMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
+    'api.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,6 +66,75 @@ DATABASES = {
     },
 }
 
+# locmem живёт в памяти одного процесса. При нескольких воркерах
+# версии моделей должны быть общими: используйте FileBasedCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Ответы инвалидируются версиями моделей, срок жизни лишь ограничивает
+# место в кэше.
+API_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Пакетная загрузка тайтлов (/titles/bulk/).
+TITLES_BULK_LIMIT = 10000
+TITLES_BULK_BATCH_SIZE = 500
+
+# Проверка бюджета SQL-запросов вью (api.middleware.QueryBudgetMiddleware):
+# 'raise' - исключение, 'log' - ошибка в лог, None - не проверять.
+QUERY_BUDGET_MODE = 'raise' if DEBUG else None
+
+# Заголовок Server-Timing и гистограммы времени по маршрутам
+# (api.middleware.ServerTimingMiddleware).
+SERVER_TIMING = True
+
+# Метрики Prometheus на /metrics (api.metrics). None - только метрики
+# текущего процесса. При нескольких воркерах задайте общую папку:
+# каждый процесс не чаще раза в METRICS_FLUSH_INTERVAL секунд пишет
+# туда свой файл, а /metrics их складывает. Очищайте папку
+# при перезапуске сервиса. Доступ к /metrics ограничивайте на прокси.
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 1
+
+# Журнал медленных SQL-запросов (api.middleware.SlowQueryMiddleware):
+# запросы дольше SLOW_QUERY_MS миллисекунд пишутся строками json
+# в SLOW_QUERY_LOG. None - журнал отключён.
+SLOW_QUERY_MS = None
+SLOW_QUERY_STACK_DEPTH = 5
+SLOW_QUERY_LOG = BASE_DIR / 'slow_queries.jsonl'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'formatter': 'message',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -97,7 +169,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.YamdbJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
@@ -108,8 +180,19 @@ SIMPLE_JWT = {
     'AUTH_HEADERS_TYPES': ('Bearer',),
 }
 
+# Проверенные access-токены в памяти процесса
+# (api.v1.authentication.token_cache). 0 - не кешировать.
+TOKEN_CACHE_SIZE = 1000
+
 AUTH_USER_MODEL = 'user.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Очередь писем (user.OutgoingEmail) отправляет команда sendemails.
+# Неудачная отправка повторяется через EMAIL_OUTBOX_RETRY_DELAY
+# секунд, затем с удвоенной задержкой, всего EMAIL_OUTBOX_MAX_ATTEMPTS
+# попыток.
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Avg
 
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 
@@ -51,9 +50,10 @@ class TitleAdmin(admin.ModelAdmin):
     list_filter = ('name',)
 
     def get_rating(self, object):
-        """Вычисляет рейтинг произведения."""
-        rating = object.reviews.aggregate(average_score=Avg('score'))
-        return round(rating.get('average_score'), 1)
+        """Возвращает рейтинг произведения."""
+        if object.rating is None:
+            return None
+        return round(object.rating, 1)
 
     get_rating.short_description = 'Рейтинг'
 
@@ -0,0 +1,107 @@
+import csv
+import gzip
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.management.commands.importcsv import model_csv_equal
+
+CHUNK_SIZE = 2000
+OUTPUT_DIR = 'export'
+
+
+class Command(BaseCommand):
+    """Команда для выгрузки базы в файлы
+    Вызов python3 manage.py exportdata
+    из терминала в соответствующей папке
+    """
+
+    help = 'Выгрузка таблиц базы в csv или jsonl в формате static/data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=OUTPUT_DIR,
+            help='Папка для выгрузки',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'jsonl'),
+            default='csv',
+            help='Формат файлов',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за раз',
+        )
+
+    def _open(self, path, compress):
+        """Открывает файл на запись, при необходимости через gzip."""
+        if compress:
+            return gzip.open(path, mode='wt', encoding='utf-8', newline='')
+        return open(path, encoding='utf-8', mode='w', newline='')
+
+    def _export_model(self, model, path, file_format, compress, chunk_size):
+        """Выгружает одну модель построчно.
+
+        Строки читаются из базы кортежами через iterator(), без создания
+        экземпляров модели, поэтому память не зависит от размера таблицы.
+        Связи выгружаются как id под именем поля (author, category),
+        как их ожидает importcsv.
+        Возвращает количество строк.
+        """
+        names = [field.name for field in model._meta.concrete_fields]
+        rows = (
+            model.objects.order_by('pk')
+            .values_list(*names)
+            .iterator(chunk_size=chunk_size)
+        )
+        count = 0
+        with self._open(path, compress) as file:
+            if file_format == 'csv':
+                writer = csv.writer(file)
+                writer.writerow(names)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                encoder = DjangoJSONEncoder(ensure_ascii=False)
+                for row in rows:
+                    file.write(encoder.encode(dict(zip(names, row))) + '\n')
+                    count += 1
+        return count
+
+    def handle(self, *args, **options):
+        """Тело команды."""
+        output = settings.BASE_DIR / options['output']
+        output.mkdir(parents=True, exist_ok=True)
+        file_format = options['format']
+        suffix = '.gz' if options['gzip'] else ''
+        for source, model in model_csv_equal.items():
+            path = output / f'{Path(source).stem}.{file_format}{suffix}'
+            started = time.perf_counter()
+            self.stdout.write(f'Выгружаем модель {model.__name__}')
+            count = self._export_model(
+                model,
+                path,
+                file_format,
+                options['gzip'],
+                options['chunk_size'],
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Выгрузка модели {model.__name__} в {path} завершена. '
+                f'Строк: {count}. '
+                f'Скорость: {count / elapsed if elapsed else count:.0f} '
+                f'строк/с.',
+            )
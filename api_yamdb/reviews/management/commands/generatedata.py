@@ -0,0 +1,282 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from math import gcd
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.management.commands.importcsv import keep_file_dates
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'тер', 'на', 'вой', 'ло', 'гор', 'ре', 'ша',
+    'зве', 'да', 'ту', 'ле', 'ген', 'мор', 'ни', 'бо', 'сте', 'ль',
+)
+VOCABULARY_SIZE = 5000
+CHUNK_SIZE = 10000
+BATCH_SIZE = 1000
+# Множитель для перестановки рангов популярности в id.
+PERMUTATION_PRIME = 2654435761
+DATES_FROM = datetime(2010, 1, 1, tzinfo=timezone.utc)
+DATES_SPAN = timedelta(days=365 * 12)
+
+
+class Zipf:
+    """Генератор рангов 0..n-1 с распределением Ципфа.
+
+    Ранг считается обращением непрерывного приближения функции
+    распределения, поэтому не нужна таблица весов на n элементов
+    и десятки миллионов отзывов выбираются за O(1) памяти.
+    Ранги переставляются в id умножением на простое число,
+    чтобы популярные объекты не шли подряд.
+    """
+
+    def __init__(self, rnd, size, exponent):
+        self.rnd = rnd
+        self.size = size
+        self.exponent = exponent
+        self.step = PERMUTATION_PRIME
+        if gcd(self.step, size) != 1:
+            self.step = 1
+
+    def rank(self):
+        """Ранг: 0 - самый популярный."""
+        value = self.rnd.random()
+        if self.exponent == 1:
+            rank = self.size ** value
+        else:
+            power = 1 - self.exponent
+            rank = ((self.size ** power - 1) * value + 1) ** (1 / power)
+        return min(int(rank), self.size) - 1
+
+    def index(self, rank=None):
+        """Номер объекта 0..n-1 для ранга; без ранга - случайный."""
+        if rank is None:
+            rank = self.rank()
+        return rank * self.step % self.size
+
+
+class Command(BaseCommand):
+    """Команда для генерации тестовых данных
+    Вызов python3 manage.py generatedata
+    из терминала в соответствующей папке
+    """
+
+    help = 'Генерация воспроизводимого набора данных для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Зерно генератора: один seed - один и тот же набор',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель Ципфа для популярности тайтлов и отзывов',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество строк, сохраняемых в одной транзакции',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Размер пачки для bulk_create',
+        )
+
+    def _next_id(self, model):
+        """Первый свободный id: данные дописываются к существующим."""
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def _random_date(self):
+        return DATES_FROM + timedelta(
+            seconds=self.rnd.randrange(int(DATES_SPAN.total_seconds())),
+        )
+
+    def _words(self, count):
+        return ' '.join(
+            self.rnd.choices(self.vocabulary, cum_weights=self.weights,
+                             k=count),
+        )
+
+    def _save(self, model, objects):
+        """Сохраняет объекты пачками по chunk_size строк в транзакции."""
+        started = time.perf_counter()
+        count = 0
+        while True:
+            chunk = list(islice(objects, self.chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic(), keep_file_dates(
+                model, ('pub_date',) if model in (Review, Comment) else (),
+            ):
+                model.objects.bulk_create(chunk, batch_size=self.batch_size)
+            count += len(chunk)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Модель {model.__name__}: {count} строк. '
+            f'Скорость: {count / elapsed if elapsed else count:.0f} строк/с.',
+        )
+
+    def _users(self, first_id, count):
+        for user_id in range(first_id, first_id + count):
+            yield User(
+                id=user_id,
+                username=f'user{user_id}',
+                email=f'user{user_id}@yamdb.fake',
+                password=UNUSABLE_PASSWORD_PREFIX,
+                date_joined=self._random_date(),
+            )
+
+    def _titles(self, first_id, count, categories):
+        first_category, category_count = categories
+        for title_id in range(first_id, first_id + count):
+            yield Title(
+                id=title_id,
+                name=self._words(self.rnd.randint(1, 4)).capitalize(),
+                year=self.rnd.randint(1900, 2022),
+                description=self._words(self.rnd.randint(5, 30)),
+                category_id=first_category + self.rnd.randrange(
+                    category_count,
+                ),
+            )
+
+    def _genre_titles(self, titles, genres):
+        first_title, title_count = titles
+        first_genre, genre_count = genres
+        genre_title_id = self._next_id(GenreTitle)
+        for title_id in range(first_title, first_title + title_count):
+            for genre in self.rnd.sample(
+                range(genre_count), min(genre_count, self.rnd.randint(1, 3)),
+            ):
+                yield GenreTitle(
+                    id=genre_title_id,
+                    title_id=title_id,
+                    genre_id=first_genre + genre,
+                )
+                genre_title_id += 1
+
+    def _review_counts(self, total, titles, users):
+        """Число отзывов на тайтл по Ципфу.
+
+        На тайтл не бывает больше отзывов, чем пользователей:
+        излишек достаётся самым популярным тайтлам, где есть место.
+        """
+        zipf = Zipf(self.rnd, titles, self.exponent)
+        counts = [0] * titles
+        for _ in range(total):
+            counts[zipf.rank()] += 1
+        overflow = sum(max(0, count - users) for count in counts)
+        for rank in range(titles):
+            counts[rank] = min(counts[rank], users)
+            if overflow:
+                added = min(overflow, users - counts[rank])
+                counts[rank] += added
+                overflow -= added
+        return [(zipf.index(rank), count) for rank, count in enumerate(counts)
+                if count]
+
+    def _reviews(self, first_id, counts, titles, users):
+        first_title = titles[0]
+        first_user, user_count = users
+        review_id = first_id
+        for title, count in counts:
+            # У тайтла своё среднее: оценки внутри тайтла согласованы.
+            mean = self.rnd.uniform(3, 9)
+            for author in self.rnd.sample(range(user_count), count):
+                yield Review(
+                    id=review_id,
+                    title_id=first_title + title,
+                    author_id=first_user + author,
+                    score=min(10, max(1, round(self.rnd.gauss(mean, 1.5)))),
+                    text=self._words(self.rnd.randint(5, 40)),
+                    pub_date=self._random_date(),
+                )
+                review_id += 1
+
+    def _comments(self, first_id, count, reviews, users):
+        first_review, review_count = reviews
+        first_user, user_count = users
+        review_zipf = Zipf(self.rnd, review_count, self.exponent)
+        user_zipf = Zipf(self.rnd, user_count, self.exponent)
+        for comment_id in range(first_id, first_id + count):
+            yield Comment(
+                id=comment_id,
+                review_id=first_review + review_zipf.index(),
+                author_id=first_user + user_zipf.index(),
+                text=self._words(self.rnd.randint(3, 20)),
+                pub_date=self._random_date(),
+            )
+
+    def handle(self, *args, **options):
+        """Тело команды."""
+        self.rnd = random.Random(options['seed'])
+        self.exponent = options['zipf']
+        self.chunk_size = options['chunk_size']
+        self.batch_size = options['batch_size']
+        words = set()
+        while len(words) < VOCABULARY_SIZE:
+            words.add(''.join(
+                self.rnd.choices(SYLLABLES, k=self.rnd.randint(2, 4)),
+            ))
+        self.vocabulary = sorted(words)
+        zipf = Zipf(self.rnd, VOCABULARY_SIZE, 1)
+        self.weights = [0] * VOCABULARY_SIZE
+        for rank in range(VOCABULARY_SIZE):
+            self.weights[zipf.index(rank)] = 1 / (rank + 1)
+        for index in range(1, VOCABULARY_SIZE):
+            self.weights[index] += self.weights[index - 1]
+
+        if options['reviews'] and not (options['titles'] and options['users']):
+            raise CommandError('Для отзывов нужны тайтлы и пользователи.')
+        if options['comments'] and not options['reviews']:
+            raise CommandError('Для комментариев нужны отзывы.')
+        if options['titles'] and not options['categories']:
+            raise CommandError('Для тайтлов нужны категории.')
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError(
+                f'Нельзя создать {options["reviews"]} отзывов: '
+                f'на тайтл не больше одного отзыва от пользователя.',
+            )
+
+        users = (self._next_id(User), options['users'])
+        self._save(User, self._users(*users))
+        categories = (self._next_id(Category), options['categories'])
+        self._save(Category, (
+            Category(id=pk, name=f'Категория {pk}', slug=f'category-{pk}')
+            for pk in range(categories[0], sum(categories))
+        ))
+        genres = (self._next_id(Genre), options['genres'])
+        self._save(Genre, (
+            Genre(id=pk, name=f'Жанр {pk}', slug=f'genre-{pk}')
+            for pk in range(genres[0], sum(genres))
+        ))
+        titles = (self._next_id(Title), options['titles'])
+        self._save(Title, self._titles(*titles, categories))
+        if options['genres']:
+            self._save(GenreTitle, self._genre_titles(titles, genres))
+        reviews = (self._next_id(Review), options['reviews'])
+        counts = self._review_counts(reviews[1], titles[1], users[1])
+        self._save(Review, self._reviews(reviews[0], counts, titles, users))
+        self._save(Comment, self._comments(
+            self._next_id(Comment), options['comments'], reviews, users,
+        ))
+        call_command('rebuildratings', stdout=self.stdout)
@@ -1,7 +1,23 @@
 import csv
+import json
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import UniqueConstraint
 
+from api import metrics
 from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
                             Title, User)
 
@@ -15,6 +31,89 @@ model_csv_equal = {
     'static/data/comments.csv': Comment,
 }
 
+CHUNK_SIZE = 10000
+BATCH_SIZE = 1000
+CHECKPOINT_PATH = 'importcsv.checkpoint.json'
+REPORT_PATH = 'importcsv.report.jsonl'
+
+# Пачка строк одного файла, start - число строк файла перед ней;
+# rows=None отмечает конец файла.
+Chunk = namedtuple('Chunk', 'key model names start rows position')
+
+
+def _init_worker():
+    """Готовит django в процессе пула, если он запущен через spawn."""
+    if not apps.ready:
+        django.setup()
+
+
+def clean_value(field, value):
+    """Приводит значение из csv к типу поля и проверяет его.
+
+    Пустая строка допустима для любого текстового поля, как и в базе:
+    правило blank относится к формам. Связи проверяются только
+    на тип: их существование проверяет база при записи или набор id
+    при --dry-run.
+    """
+    if field.null and value == '':
+        return None
+    value = field.to_python(value)
+    if field.is_relation or value in field.empty_values:
+        return value
+    field.validate(value, None)
+    field.run_validators(value)
+    return value
+
+
+@contextmanager
+def keep_file_dates(model, names):
+    """Сохраняет даты из файла вместо текущего времени.
+
+    auto_now и auto_now_add отключаются только у полей, которые
+    есть в файле, и только на время записи пачки.
+    """
+    fields = [
+        field for field in (model._meta.get_field(name) for name in names)
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def parse_chunk(model_label, names, rows):
+    """Разбирает и проверяет пачку строк csv.
+
+    Выполняется в процессах пула, поэтому работает только с метаданными
+    моделей и не обращается к базе. Возвращает пары (номер строки
+    в пачке, значения полей) для корректных строк и пары
+    (номер строки в пачке, {поле: [ошибки]}) для остальных.
+    """
+    fields = [apps.get_model(model_label)._meta.get_field(name)
+              for name in names]
+    values = []
+    errors = []
+    for index, row in enumerate(rows):
+        row_values = []
+        row_errors = {}
+        for field, value in zip(fields, row):
+            try:
+                row_values.append(clean_value(field, value))
+            except ValidationError as error:
+                row_errors[field.name] = error.messages
+        if row_errors:
+            errors.append((index, row_errors))
+        else:
+            values.append((index, tuple(row_values)))
+    return values, errors
+
 
 class Command(BaseCommand):
     """Команда для импорта csv в базу
@@ -24,42 +123,470 @@ class Command(BaseCommand):
 
     help = 'Импорт csv файлов в таблицы базы'
 
-    def _create_correct_row_fields(self, row):
-        """Дополняет строку таблицы экземплярами модели."""
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество строк, сохраняемых в одной транзакции',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Размер пачки для bulk_create',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для разбора csv',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванный импорт с последней сохранённой пачки',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=CHECKPOINT_PATH,
+            help='Файл с позициями импорта',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только проверить файлы, ничего не записывая в базу',
+        )
+        parser.add_argument(
+            '--report',
+            help='Файл jsonl для ошибочных строк; '
+                 f'при --dry-run по умолчанию {REPORT_PATH}',
+        )
+
+    def _load_checkpoint(self, path, resume):
+        """Читает позиции прерванного импорта."""
+        if not resume:
+            return {}
         try:
-            if row.get('author'):
-                row['author'] = User.objects.get(pk=row['author'])
-            if row.get('review_id'):
-                row['review'] = Review.objects.get(pk=row['review_id'])
-            if row.get('title_id'):
-                row['title'] = Title.objects.get(pk=row['title_id'])
-            if row.get('category'):
-                row['category'] = Category.objects.get(pk=row['category'])
-            if row.get('genre'):
-                row['genre'] = Genre.objects.get(pk=row['genre'])
-        except Exception as error:
-            print(f'Ошибка в строке {row.get("id")}.\n'
-                  f'Текст - {error}')
-        return row
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _save_checkpoint(self):
+        """Атомарно записывает позиции импорта на диск."""
+        temp_path = f'{self.checkpoint_path}.tmp'
+        with open(temp_path, encoding='utf-8', mode='w') as file:
+            json.dump(self.checkpoint, file, ensure_ascii=False, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _get_progress(self, key, path):
+        """Позиция файла в чекпоинте; новый файл начинается с нуля."""
+        stat = os.stat(path)
+        progress = self.checkpoint.setdefault(key, {
+            'rows': 0,
+            'position': None,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'done': False,
+        })
+        if (progress['size'], progress['mtime']) != (
+            stat.st_size, stat.st_mtime,
+        ):
+            raise CommandError(
+                f'Файл {key} изменился после прерванного импорта. '
+                f'Удалите {self.checkpoint_path} и запустите импорт заново.',
+            )
+        return progress
+
+    def _get_columns(self, model, header):
+        """Проверяет колонки csv и возвращает attname полей модели.
+
+        Колонка с именем связи (author, category) пишется прямо
+        в поле *_id, без загрузки связанного объекта.
+        """
+        columns = []
+        for name in header:
+            try:
+                columns.append(model._meta.get_field(name).attname)
+            except FieldDoesNotExist:
+                raise CommandError(
+                    f'В модели {model.__name__} нет поля {name}',
+                )
+        return columns
+
+    def _save_chunk(self, model, objects, batch_size):
+        """Сохраняет пачку строк одной транзакцией.
+
+        Если пачка не сохранилась целиком, строки сохраняются
+        по одной, чтобы найти и показать ошибочные.
+        Возвращает (вставлено, конфликтов): строки с повтором
+        уникальных значений ignore_conflicts молча пропускает,
+        поэтому вставленные считаются по числу строк таблицы.
+        """
+        try:
+            with transaction.atomic():
+                before = model.objects.count()
+                model.objects.bulk_create(
+                    objects, batch_size=batch_size, ignore_conflicts=True,
+                )
+                inserted = model.objects.count() - before
+            return inserted, len(objects) - inserted
+        except Exception:
+            pass
+        before = model.objects.count()
+        successful = 0
+        for obj in objects:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create((obj,), ignore_conflicts=True)
+                successful += 1
+            except Exception as error:
+                self.stderr.write(f'Ошибка в строке {obj.pk}.\n'
+                                  f'Текст - {error}')
+        inserted = model.objects.count() - before
+        return inserted, successful - inserted
+
+    def _import_order(self, files):
+        """Упорядочивает файлы так, чтобы связанные модели шли раньше.
+
+        Граф строится по внешним ключам между импортируемыми моделями:
+        category, genre, users -> titles -> genre_title, review
+        -> comments. Файлы без зависимостей между собой сохраняют
+        исходный порядок.
+        """
+        models = {model for _, _, model in files}
+        dependencies = {
+            model: {
+                field.related_model for field in model._meta.concrete_fields
+                if field.many_to_one and field.related_model in models
+                and field.related_model is not model
+            }
+            for model in models
+        }
+        ordered = []
+        done = set()
+        while len(ordered) < len(files):
+            ready = [file for file in files if file not in ordered
+                     and dependencies[file[2]] <= done]
+            if not ready:
+                raise CommandError('Циклическая зависимость между моделями')
+            ordered.extend(ready)
+            done.update(model for _, _, model in ready)
+        return ordered
+
+    def _read_chunks(self, files, chunk_size):
+        """Читает файлы пачками, в памяти лежит только текущая пачка.
+
+        Для каждой пачки запоминается позиция в файле после неё,
+        чтобы --resume продолжал без повторного чтения загруженного.
+        """
+        for key, path, model in files:
+            progress = self._get_progress(key, path)
+            if progress['done']:
+                self.stdout.write(f'Модель {model.__name__} уже наполнена')
+                continue
+            with open(path, encoding='utf-8', mode='r', newline='') as file:
+                # readline вместо итерации по файлу: так работает tell().
+                lines = iter(file.readline, '')
+                names = next(csv.reader(lines))
+                self._get_columns(model, names)
+                if progress['position'] is not None:
+                    file.seek(progress['position'])
+                    self.stdout.write(
+                        f'{model.__name__}: продолжаем со строки '
+                        f'{progress["rows"] + 1}',
+                    )
+                csv_read = csv.reader(lines)
+                start = progress['rows']
+                while True:
+                    rows = list(islice(csv_read, chunk_size))
+                    if not rows:
+                        break
+                    yield Chunk(key, model, names, start, rows, file.tell())
+                    start += len(rows)
+            yield Chunk(key, model, names, None, None, None)
+
+    def _parse_chunks(self, chunks, pool, prefetch):
+        """Разбирает пачки в пуле, сохраняя порядок файлов и строк.
+
+        Впереди записи разбирается не больше prefetch пачек, так что
+        память не растёт с размером файлов. Без пула пачки
+        разбираются в текущем процессе по мере записи.
+        """
+        pending = deque()
+        for chunk in chunks:
+            if chunk.rows is None:
+                result = None
+            elif pool is None:
+                result = partial(
+                    parse_chunk, chunk.model._meta.label,
+                    chunk.names, chunk.rows,
+                )
+            else:
+                result = pool.submit(
+                    parse_chunk, chunk.model._meta.label,
+                    chunk.names, chunk.rows,
+                ).result
+            pending.append((chunk, result))
+            if len(pending) > prefetch:
+                chunk, result = pending.popleft()
+                yield chunk, result and result()
+        while pending:
+            chunk, result = pending.popleft()
+            yield chunk, result and result()
+
+    def _known_ids(self, model):
+        """Набор id модели: из базы и из уже проверенных строк."""
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True).iterator(),
+            )
+        return self.known_ids[model]
+
+    def _check_relations(self, chunk, values):
+        """Проверяет связи по наборам id вместо запроса на каждую строку.
+
+        Корректные строки пополняют набор id своей модели: файлы идут
+        в порядке зависимостей, так что ссылки на них из следующих
+        файлов тоже проверяются.
+        """
+        model = chunk.model
+        fields = [model._meta.get_field(name) for name in chunk.names]
+        relations = [
+            (position, field, self._known_ids(field.related_model))
+            for position, field in enumerate(fields) if field.many_to_one
+        ]
+        pk_position = chunk.names.index(model._meta.pk.name) if (
+            model._meta.pk.name in chunk.names
+            and model in self.referenced
+        ) else None
+        valid = []
+        errors = []
+        for index, row in values:
+            row_errors = {
+                field.name: [
+                    f'Нет объекта {field.related_model.__name__} '
+                    f'с id {row[position]}',
+                ]
+                for position, field, ids in relations
+                if row[position] is not None and row[position] not in ids
+            }
+            if row_errors:
+                errors.append((index, row_errors))
+                continue
+            valid.append((index, row))
+            if pk_position is not None:
+                self._known_ids(model).add(row[pk_position])
+        return valid, errors
+
+    def _unique_keys(self, model, columns):
+        """Уникальные наборы полей модели, которые целиком есть в файле.
+
+        Возвращает пары (имена полей, позиции колонок).
+        """
+        opts = model._meta
+        keys = [(field.name,) for field in opts.concrete_fields
+                if field.unique]
+        keys.extend(tuple(fields) for fields in opts.unique_together)
+        keys.extend(
+            tuple(constraint.fields) for constraint in opts.constraints
+            if isinstance(constraint, UniqueConstraint)
+            and constraint.condition is None
+        )
+        result = []
+        for key in keys:
+            attnames = [opts.get_field(name).attname for name in key]
+            if set(attnames) <= set(columns):
+                result.append(
+                    (key, [columns.index(attname) for attname in attnames]),
+                )
+        return result
+
+    def _check_unique(self, chunk, values):
+        """Находит строки, которые импорт пропустил бы как конфликты.
+
+        Значения сверяются с базой и с предыдущими строками файла;
+        наборы значений загружаются один раз на модель, как и id.
+        """
+        model = chunk.model
+        keys = self._unique_keys(
+            model, self._get_columns(model, chunk.names),
+        )
+        valid = []
+        errors = []
+        for index, row in values:
+            row_errors = {}
+            row_keys = []
+            for key, positions in keys:
+                value = tuple(row[position] for position in positions)
+                if None in value:
+                    continue
+                seen = self.unique_values.get((model, key))
+                if seen is None:
+                    seen = self.unique_values[(model, key)] = set(
+                        model.objects.values_list(*key).iterator(),
+                    )
+                if value in seen:
+                    row_errors[','.join(key)] = [
+                        'Повтор уникального значения '
+                        f'{", ".join(map(str, value))}: строка была бы '
+                        'пропущена',
+                    ]
+                row_keys.append((seen, value))
+            if row_errors:
+                errors.append((index, row_errors))
+                continue
+            valid.append((index, row))
+            for seen, value in row_keys:
+                seen.add(value)
+        return valid, errors
+
+    def _report_errors(self, chunk, errors):
+        """Пишет ошибочные строки в stderr и в отчёт jsonl."""
+        id_position = chunk.names.index('id') if 'id' in chunk.names else None
+        for index, row_errors in sorted(errors, key=lambda error: error[0]):
+            row = chunk.rows[index]
+            pk = row[id_position] if id_position is not None else None
+            text = '; '.join(
+                f'{name}: {" ".join(messages)}'
+                for name, messages in row_errors.items()
+            )
+            self.stderr.write(f'Ошибка в строке {pk}.\n'
+                              f'Текст - {text}')
+            if self.report is not None:
+                self.report.write(json.dumps({
+                    'file': chunk.key,
+                    'row': chunk.start + index + 1,
+                    'id': pk,
+                    'values': dict(zip(chunk.names, row)),
+                    'errors': row_errors,
+                }, ensure_ascii=False) + '\n')
+        self.errors += len(errors)
+
+    def _write_chunks(self, parsed, batch_size, dry_run):
+        """Единственный писатель: сохраняет разобранные пачки по порядку.
+
+        SQLite допускает одну пишущую транзакцию, поэтому запись
+        не распараллеливается. При dry_run пачки только проверяются.
+        """
+        stats = {}
+        for chunk, result in parsed:
+            model = chunk.model
+            if chunk.key not in stats:
+                self.stdout.write(
+                    f'Проверяем модель {model.__name__}' if dry_run
+                    else f'Наполняем модель {model.__name__}',
+                )
+                stats[chunk.key] = [0, 0, 0, time.perf_counter()]
+            file_stats = stats[chunk.key]
+            progress = self.checkpoint[chunk.key]
+            if result is None:
+                rows, successful, conflicts, started = file_stats
+                elapsed = time.perf_counter() - started
+                if not dry_run:
+                    progress['done'] = True
+                    self._save_checkpoint()
+                self.stdout.write(
+                    (f'Проверка модели {model.__name__} завершена. '
+                     if dry_run else
+                     f'Наполнение модели {model.__name__} завершено. ')
+                    + f'Строк: {rows}. Успешно: {successful}. '
+                    + ('' if dry_run else f'Конфликтов: {conflicts}. ')
+                    + f'Скорость: {rows / elapsed if elapsed else rows:.0f} '
+                    f'строк/с.',
+                )
+                continue
+            values, errors = result
+            if dry_run:
+                values, relation_errors = self._check_relations(chunk, values)
+                values, unique_errors = self._check_unique(chunk, values)
+                errors.extend(relation_errors + unique_errors)
+            self._report_errors(chunk, errors)
+            file_stats[0] += len(chunk.rows)
+            if dry_run:
+                file_stats[1] += len(values)
+                continue
+            columns = self._get_columns(model, chunk.names)
+            with keep_file_dates(model, chunk.names):
+                successful, conflicts = self._save_chunk(
+                    model,
+                    [model(**dict(zip(columns, row))) for _, row in values],
+                    batch_size,
+                )
+            if conflicts:
+                self.stderr.write(
+                    f'{model.__name__}: пропущено строк с повтором '
+                    f'уникальных значений: {conflicts}.',
+                )
+            file_stats[1] += successful
+            file_stats[2] += conflicts
+            labels = {'model': model._meta.label_lower}
+            metrics.inc('yamdb_import_rows_total',
+                        dict(labels, result='imported'), successful)
+            metrics.inc('yamdb_import_rows_total',
+                        dict(labels, result='conflict'), conflicts)
+            metrics.inc('yamdb_import_rows_total',
+                        dict(labels, result='failed'),
+                        len(chunk.rows) - successful - conflicts)
+            progress['rows'] += len(chunk.rows)
+            progress['position'] = chunk.position
+            self._save_checkpoint()
 
     def handle(self, *args, **options):
         """Тело команды."""
-        for i in model_csv_equal.items():
-            path, model = i
-            rows = 0
-            successful = 0
-            print(f'Наполняем модель {model.__name__}')
-            with open(path, encoding='utf-8', mode='r') as file:
-                csv_read = csv.DictReader(file)
-                for row in csv_read:
-                    rows += 1
-                    row = self._create_correct_row_fields(row)
-                    try:
-                        model.objects.get_or_create(**row)
-                        successful += 1
-                    except Exception as error:
-                        print(f'Ошибка в строке {row.get("id")}.\n'
-                              f'Текст - {error}')
-            print(f'Наполнение модели {model.__name__} завершено. '
-                  f'Строк: {rows}. Успешно: {successful}.',
-                  )
+        dry_run = options['dry_run']
+        self.checkpoint_path = settings.BASE_DIR / options['checkpoint']
+        self.checkpoint = self._load_checkpoint(
+            self.checkpoint_path, options['resume'] and not dry_run,
+        )
+        files = self._import_order([
+            (str(path), settings.BASE_DIR / path, model)
+            for path, model in model_csv_equal.items()
+        ])
+        self.known_ids = {}
+        self.unique_values = {}
+        self.referenced = {
+            field.related_model
+            for _, _, model in files
+            for field in model._meta.concrete_fields if field.many_to_one
+        }
+        self.errors = 0
+        report_path = options['report'] or (REPORT_PATH if dry_run else None)
+        self.report = None
+        if report_path:
+            report_path = settings.BASE_DIR / report_path
+            self.report = open(report_path, encoding='utf-8', mode='w')
+        try:
+            chunks = self._read_chunks(files, options['chunk_size'])
+            workers = options['workers']
+            if workers > 1:
+                with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker,
+                ) as pool:
+                    self._write_chunks(
+                        self._parse_chunks(chunks, pool, 2 * workers),
+                        options['batch_size'],
+                        dry_run,
+                    )
+            else:
+                self._write_chunks(
+                    self._parse_chunks(chunks, None, 0),
+                    options['batch_size'],
+                    dry_run,
+                )
+        finally:
+            if self.report is not None:
+                self.report.close()
+            metrics.registry.flush(force=True)
+        if dry_run:
+            if self.errors:
+                raise CommandError(
+                    f'Ошибочных строк: {self.errors}. Отчёт: {report_path}',
+                )
+            self.stdout.write('Ошибок не найдено.')
+            return
+        call_command('rebuildratings', stdout=self.stdout)
+        os.remove(self.checkpoint_path)
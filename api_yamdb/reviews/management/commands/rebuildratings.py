@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from reviews.models import SCORES, Review, Title, score_counter_name
+from reviews.signals import title_score_changed
+
+
+class Command(BaseCommand):
+    """Команда для пересчёта рейтингов тайтлов
+    Вызов python3 manage.py rebuildratings
+    из терминала в соответствующей папке
+    """
+
+    help = 'Пересчёт счётчиков оценок, гистограмм и рейтингов тайтлов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество тайтлов, пересчитываемых в одной транзакции',
+        )
+
+    def _rebuild_chunk(self, first_id, last_id):
+        """Пересчитывает счётчики для тайтлов с id в (first_id, last_id].
+
+        Счётчики считаются коррелированными подзапросами по индексу
+        отзывов тайтла, поэтому на пачку уходит два UPDATE
+        без выборки отзывов в python. Рейтинг обновляется вторым
+        запросом: в одном UPDATE выражения видят старые значения.
+        """
+        reviews = Review.objects.filter(title=OuterRef('pk')).order_by()
+
+        def aggregate(expression, **filters):
+            return Coalesce(Subquery(
+                reviews.filter(**filters).values('title')
+                .annotate(value=expression).values('value'),
+            ), 0)
+
+        titles = Title.objects.filter(id__gt=first_id, id__lte=last_id)
+        with transaction.atomic():
+            titles.update(
+                score_sum=aggregate(Sum('score')),
+                score_count=aggregate(Count('id')),
+                **{
+                    score_counter_name(score): aggregate(
+                        Count('id'), score=score,
+                    )
+                    for score in SCORES
+                },
+            )
+            titles.update(
+                rating=(Cast('score_sum', FloatField())
+                        / NullIf('score_count', 0)),
+            )
+
+    def handle(self, *args, **options):
+        """Тело команды."""
+        chunk_size = options['chunk_size']
+        title_ids = Title.objects.order_by('id').values_list('id', flat=True)
+        last_id = 0
+        total = 0
+        while True:
+            chunk = list(title_ids.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            self._rebuild_chunk(last_id, chunk[-1])
+            last_id = chunk[-1]
+            total += len(chunk)
+        title_score_changed.send(sender=Title)
+        self.stdout.write(f'Пересчитано тайтлов: {total}.')
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.20 on 2026-10-18 20:14
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_scores(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    scores = (
+        Review.objects.order_by()
+        .values('title_id')
+        .annotate(score_sum=Sum('score'), score_count=Count('id'))
+    )
+    for row in scores.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            score_sum=row['score_sum'],
+            score_count=row['score_count'],
+            rating=row['score_sum'] / row['score_count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.20 on 2026-10-18 20:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from reviews.search import install_title_search, uninstall_title_search
+
+
+def create_title_search(apps, schema_editor):
+    install_title_search(schema_editor.connection.alias, rebuild=True)
+
+
+def drop_title_search(apps, schema_editor):
+    uninstall_title_search(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.title')),
+                ('name', models.TextField()),
+                ('description', models.TextField(null=True)),
+                ('query', models.TextField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_title_search, drop_title_search),
+    ]
@@ -1,6 +1,9 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
 
+from reviews.signals import title_score_changed
 from reviews.validators import validate_year
 from user.models import User
 
@@ -50,9 +53,61 @@ class Genre(models.Model):
         return self.slug
 
 
+SCORES = range(1, 11)
+
+
+def score_counter_name(score):
+    """Имя поля-счётчика оценки score в гистограмме тайтла."""
+    return f'score_{score}'
+
+
+def _score_counter(score):
+    return models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=f'Количество оценок {score}',
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+    """Кверисет тайтлов."""
+
+    def change_score(self, added=None, removed=None):
+        """Учитывает добавленную и/или убранную оценку одним UPDATE.
+
+        Сдвигает сумму и количество оценок, счётчики гистограммы
+        и пересчитывает рейтинг. Все выражения в SET вычисляются
+        по старым значениям строки, поэтому рейтинг считается
+        от уже сдвинутых счётчиков.
+        """
+        score_delta = (added or 0) - (removed or 0)
+        count_delta = (added is not None) - (removed is not None)
+        score_sum = F('score_sum') + score_delta
+        score_count = F('score_count') + count_delta
+        counters = {}
+        if added != removed:
+            if added is not None:
+                name = score_counter_name(added)
+                counters[name] = F(name) + 1
+            if removed is not None:
+                name = score_counter_name(removed)
+                counters[name] = F(name) - 1
+        updated = self.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=Cast(score_sum, FloatField()) / NullIf(score_count, 0),
+            **counters,
+        )
+        if updated:
+            title_score_changed.send(sender=self.model)
+        return updated
+
+
 class Title(models.Model):
     """Модель тайтла."""
 
+    objects = TitleQuerySet.as_manager()
+
     name = models.CharField(
         max_length=256,
         verbose_name='Название тайтла',
@@ -80,16 +135,78 @@ class Title(models.Model):
         null=True,
         blank=True,
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    score_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок',
+    )
+    rating = models.FloatField(
+        null=True,
+        editable=False,
+        verbose_name='Рейтинг',
+    )
+    score_1 = _score_counter(1)
+    score_2 = _score_counter(2)
+    score_3 = _score_counter(3)
+    score_4 = _score_counter(4)
+    score_5 = _score_counter(5)
+    score_6 = _score_counter(6)
+    score_7 = _score_counter(7)
+    score_8 = _score_counter(8)
+    score_9 = _score_counter(9)
+    score_10 = _score_counter(10)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         default_related_name = 'titles'
+        indexes = (
+            models.Index(
+                fields=('name', 'id'),
+                name='title_name_id_idx',
+            ),
+        )
 
     def __str__(self):
         """Возвращает название тайтла."""
         return self.name
 
+    @property
+    def score_histogram(self):
+        """Количество оценок от 1 до 10."""
+        return [
+            {'score': score, 'count': getattr(self, score_counter_name(score))}
+            for score in SCORES
+        ]
+
+
+class TitleSearch(models.Model):
+    """Полнотекстовый индекс тайтлов (виртуальная таблица FTS5).
+
+    Таблица и триггеры синхронизации создаются в reviews.search.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    name = models.TextField()
+    description = models.TextField(null=True)
+    query = models.TextField(db_column='reviews_title_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+
 
 class GenreTitle(models.Model):
     """Связь жанра и тайтла."""
@@ -113,6 +230,12 @@ class GenreTitle(models.Model):
                 name='unique_genre_title',
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', 'genre'),
+                name='genretitle_title_genre_idx',
+            ),
+        )
 
     def __str__(self):
         return f'{self.title} {self.genre}'
@@ -145,6 +268,10 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -162,11 +289,34 @@ class Review(models.Model):
                 name='unique_review',
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='review_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         """Возвращает текст отзыва."""
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает тайтл и оценку из базы.
+
+        По ним обработчик post_save сдвигает счётчики тайтлов
+        при изменении отзыва без лишнего SELECT.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._saved_score = (
+            instance.__dict__.get('title_id'), instance.__dict__.get('score'),
+        )
+        return instance
+
 
 class Comment(models.Model):
     """Модель комментария."""
@@ -182,6 +332,10 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
     review = models.ForeignKey(
         Review,
         on_delete=models.CASCADE,
@@ -193,6 +347,16 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='comment_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         """Возвращает текст комментария."""
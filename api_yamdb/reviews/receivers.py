@@ -0,0 +1,126 @@
+from contextvars import ContextVar
+
+from django.core.signals import request_finished
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+from reviews.search import install_title_search
+from user.models import User
+
+# Тайтлы, удаляемые прямо сейчас: их отзывы удаляются каскадом,
+# и сдвигать счётчики строки, которая сейчас исчезнет, незачем.
+_deleting_titles = ContextVar('deleting_titles', default=frozenset())
+
+
+@receiver(pre_save, sender=Review)
+def review_saving(sender, instance, raw, **kwargs):
+    """Находит прежние тайтл и оценку, если отзыв загружен не целиком.
+
+    Обычно они запомнены в Review.from_db; SELECT нужен только
+    для отзыва, собранного вручную с pk, или с отложенной оценкой.
+    """
+    if raw or instance.pk is None:
+        return
+    saved = getattr(instance, '_saved_score', (None, None))
+    if None in saved:
+        instance._saved_score = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list('title_id', 'score').first()
+        ) or (None, None)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw, **kwargs):
+    """Учитывает оценку созданного или изменённого отзыва.
+
+    Отзыв, перенесённый на другой тайтл, переносит и оценку.
+    Создание, изменение и удаление обрабатываются на уровне сигналов
+    модели, поэтому счётчики сходятся для любого пути сохранения:
+    api, админки, shell. bulk_create и QuerySet.update сигналов
+    не отправляют - после них нужен rebuildratings.
+    """
+    if raw:
+        return
+    old_title, old_score = (
+        (None, None) if created
+        else getattr(instance, '_saved_score', (None, None))
+    )
+    if old_title == instance.title_id:
+        if old_score != instance.score:
+            Title.objects.filter(pk=instance.title_id).change_score(
+                added=instance.score, removed=old_score,
+            )
+    else:
+        if old_title is not None:
+            Title.objects.filter(pk=old_title).change_score(
+                removed=old_score,
+            )
+        Title.objects.filter(pk=instance.title_id).change_score(
+            added=instance.score,
+        )
+    instance._saved_score = (instance.title_id, instance.score)
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    """Помечает тайтл удаляемым до каскадного удаления его отзывов.
+
+    Collector отправляет pre_delete всех объектов до удаления,
+    а post_delete отзывов - раньше, чем post_delete тайтла.
+    """
+    _deleting_titles.set(_deleting_titles.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    _deleting_titles.set(_deleting_titles.get() - {instance.pk})
+
+
+@receiver(request_finished)
+def deleting_titles_reset(sender, **kwargs):
+    """Снимает пометки, оставшиеся от откатившегося удаления."""
+    _deleting_titles.set(frozenset())
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва из счётчиков тайтла.
+
+    Срабатывает и при каскадном удалении отзывов вместе с автором.
+    Отзывы удаляемого тайтла пропускаются: иначе удаление тайтла
+    с N отзывами делало бы N UPDATE и N сбросов кэша.
+    """
+    if instance.title_id in _deleting_titles.get():
+        return
+    Title.objects.filter(pk=instance.title_id).change_score(
+        removed=instance.score,
+    )
+
+
+@receiver(post_save, sender=User)
+def author_renamed(sender, instance, created, raw, **kwargs):
+    """Сдвигает дату изменения отзывов и комментариев автора.
+
+    Имя автора входит в их ответы, а ETag и Last-Modified строятся
+    по дате изменения строки. Переименования редки, поэтому дешевле
+    обновить строки автора при записи, чем присоединять
+    пользователей к каждой проверке условного GET.
+    """
+    if raw or created:
+        return
+    saved = getattr(instance, '_saved_username', None)
+    if saved is not None and saved != instance.username:
+        now = timezone.now()
+        Review.objects.filter(author=instance).update(updated=now)
+        Comment.objects.filter(author=instance).update(updated=now)
+    instance._saved_username = instance.username
+
+
+@receiver(post_migrate)
+def title_search_installed(sender, using, **kwargs):
+    """Восстанавливает триггеры FTS после пересоздания reviews_title."""
+    if sender.name == 'reviews':
+        install_title_search(using)
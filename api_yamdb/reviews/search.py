@@ -0,0 +1,106 @@
+import re
+
+from django.db import connections
+
+TITLE_SEARCH_TABLE = 'reviews_title_fts'
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+CREATE_TITLE_SEARCH_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_SEARCH_TABLE} USING fts5(
+        name,
+        description,
+        content='reviews_title',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}, rank)
+    VALUES ('rank', 'bm25({NAME_WEIGHT}, {DESCRIPTION_WEIGHT})')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_ai
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_ad
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {TITLE_SEARCH_TABLE}(
+            {TITLE_SEARCH_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_au
+    AFTER UPDATE ON reviews_title
+    WHEN old.name IS NOT new.name
+        OR old.description IS NOT new.description
+    BEGIN
+        INSERT INTO {TITLE_SEARCH_TABLE}(
+            {TITLE_SEARCH_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+DROP_TITLE_SEARCH_SQL = (
+    f'DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_au',
+    f'DROP TABLE IF EXISTS {TITLE_SEARCH_TABLE}',
+)
+
+SEARCH_TERM = re.compile(r'\w+')
+
+
+def title_search_available(using='default'):
+    """Полнотекстовый индекс есть только у SQLite."""
+    return connections[using].vendor == 'sqlite'
+
+
+def install_title_search(using='default', rebuild=False):
+    """Создаёт FTS5-индекс тайтлов и триггеры синхронизации.
+
+    Вызывается после каждой миграции: SQLite пересоздаёт таблицу
+    reviews_title при изменении схемы и теряет её триггеры.
+    """
+    if not title_search_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        for sql in CREATE_TITLE_SEARCH_SQL:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(
+                f'INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}) '
+                f"VALUES ('rebuild')",
+            )
+
+
+def uninstall_title_search(using='default'):
+    """Удаляет FTS5-индекс тайтлов."""
+    if not title_search_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        for sql in DROP_TITLE_SEARCH_SQL:
+            cursor.execute(sql)
+
+
+def build_search_query(text):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово ищется по префиксу, слова объединяются через AND.
+    Регистр (в том числе кириллицы) сворачивает токенизатор unicode61.
+    """
+    terms = SEARCH_TERM.findall(text)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Отправляется после изменения счётчиков оценок (и рейтинга) тайтлов.
+title_score_changed = Signal()
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from user.models import User
+from user.models import OutgoingEmail, User
 
 admin.site.register(User)
+admin.site.register(OutgoingEmail)
@@ -0,0 +1,173 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import metrics
+from user.models import OutgoingEmail
+
+BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    """Команда для отправки писем из очереди
+    Вызов python3 manage.py sendemails
+    из терминала в соответствующей папке
+
+    Все пачки уходят через одно соединение с почтовым сервером.
+    Неотправленное письмо повторяется с удваивающейся задержкой,
+    пока не кончатся попытки; если сервер недоступен, попытку
+    получают все письма пачки. Отметка об отправке ставится после
+    пачки, поэтому при падении воркера письмо может уйти повторно.
+    Запускайте один воркер: строки очереди не блокируются.
+    """
+
+    help = 'Отправка писем из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество писем, выбираемых из очереди за раз',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            help='Сколько раз пытаться отправить письмо',
+        )
+        parser.add_argument(
+            '--retry-delay',
+            type=int,
+            default=settings.EMAIL_OUTBOX_RETRY_DELAY,
+            help='Задержка перед первым повтором в секундах',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop, секунд',
+        )
+
+    def _pending(self, batch_size, max_attempts):
+        return list(
+            OutgoingEmail.objects.filter(
+                sent__isnull=True,
+                attempts__lt=max_attempts,
+                next_attempt__lte=timezone.now(),
+            ).order_by('next_attempt', 'id')[:batch_size],
+        )
+
+    def _retry_later(self, email, error, max_attempts, retry_delay):
+        email.attempts += 1
+        email.next_attempt = timezone.now() + timedelta(
+            seconds=retry_delay * 2 ** (email.attempts - 1),
+        )
+        email.last_error = str(error)
+        email.save(update_fields=('attempts', 'next_attempt', 'last_error'))
+        if email.attempts >= max_attempts:
+            self.stderr.write(
+                f'Письмо {email.pk} не отправлено за {email.attempts} '
+                f'попыток.\nТекст - {error}',
+            )
+
+    def _open(self, connection, reopen=False):
+        """Открывает соединение; возвращает ошибку или None."""
+        try:
+            if reopen:
+                connection.close()
+            connection.open()
+        except Exception as error:
+            return error
+        return None
+
+    def _send_batch(self, connection, emails, max_attempts, retry_delay):
+        """Отправляет пачку; возвращает (отправлено, ошибок, соединение).
+
+        Если соединение не открылось, остальные письма пачки
+        откладываются с той же ошибкой.
+        """
+        sent = []
+        failed = 0
+        try:
+            error = self._open(connection)
+            unsent, sendable = (emails, ()) if error else ((), emails)
+            for index, email in enumerate(sendable):
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, [email.to],
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as send_error:
+                    failed += 1
+                    self._retry_later(
+                        email, send_error, max_attempts, retry_delay,
+                    )
+                    # После ошибки соединение может быть разорвано.
+                    error = self._open(connection, reopen=True)
+                    if error is not None:
+                        unsent = emails[index + 1:]
+                        break
+                else:
+                    sent.append(email.pk)
+            for email in unsent:
+                failed += 1
+                self._retry_later(email, error, max_attempts, retry_delay)
+            if error is not None:
+                self.stderr.write(
+                    f'Почтовый сервер недоступен.\nТекст - {error}',
+                )
+        finally:
+            OutgoingEmail.objects.filter(pk__in=sent).update(
+                sent=timezone.now(),
+            )
+            metrics.inc('yamdb_emails_total', {'result': 'sent'}, len(sent))
+            metrics.inc('yamdb_emails_total', {'result': 'failed'}, failed)
+        return len(sent), failed, error is None
+
+    def handle(self, *args, **options):
+        """Тело команды."""
+        total_sent = total_failed = 0
+        connection = get_connection()
+        try:
+            while True:
+                emails = self._pending(
+                    options['batch_size'], options['max_attempts'],
+                )
+                if not emails:
+                    if not options['loop']:
+                        break
+                    # Простаивающее соединение закрывает сервер.
+                    connection.close()
+                    time.sleep(options['interval'])
+                    continue
+                sent, failed, connected = self._send_batch(
+                    connection, emails, options['max_attempts'],
+                    options['retry_delay'],
+                )
+                total_sent += sent
+                total_failed += failed
+                if options['loop']:
+                    self.stdout.write(
+                        f'Отправлено писем: {sent}. Ошибок: {failed}.',
+                    )
+                if not connected:
+                    # Сервер недоступен: без --loop ждать его незачем.
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+        finally:
+            connection.close()
+            metrics.registry.flush(force=True)
+        self.stdout.write(
+            f'Отправлено писем: {total_sent}. Ошибок: {total_failed}.',
+        )
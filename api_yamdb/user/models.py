@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.utils import timezone
 
 
 class UserRole(models.TextChoices):
@@ -44,6 +45,13 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает имя из базы, чтобы заметить переименование."""
+        instance = super().from_db(db, field_names, values)
+        instance._saved_username = instance.__dict__.get('username')
+        return instance
+
     @property
     def is_admin(self):
         return (
@@ -55,3 +63,48 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == UserRole.MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Вью только добавляют строку, а отправляет письма команда
+    sendemails: пачками через одно соединение и с повторами.
+    """
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    to = models.EmailField(max_length=254, verbose_name='Получатель')
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    sent = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата отправки',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Неудачных попыток',
+    )
+    next_attempt = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка',
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Письма'
+        indexes = (
+            models.Index(
+                fields=('next_attempt', 'id'),
+                condition=models.Q(sent__isnull=True),
+                name='outgoingemail_pending_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,256 @@
+"""Замеры эндпоинтов api/v1 с базовой линией для поиска регрессий.
+
+Для каждого размера набора данных база наполняется generatedata,
+после чего каждый сценарий выполняется --repeat раз. Кеш очищается
+перед каждым запросом, так что замеряется путь до базы.
+Для сценария записываются p50/p95 времени ответа, число запросов
+к базе и пиковая память python (tracemalloc).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_endpoints --sizes small medium
+    python -m benchmarks.bench_endpoints --save-baseline
+
+Код выхода 1, если есть регрессия относительно базовой линии:
+больше запросов к базе, память или время (p50 и p95 вместе)
+хуже на --tolerance.
+"""
+import argparse
+import io
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, setup_django
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline_endpoints.json'
+SIZES = {
+    'small': {
+        'users': 1000, 'titles': 1000, 'reviews': 20000, 'comments': 20000,
+    },
+    'medium': {
+        'users': 5000, 'titles': 10000, 'reviews': 200000,
+        'comments': 200000,
+    },
+    'large': {
+        'users': 20000, 'titles': 100000, 'reviews': 2000000,
+        'comments': 2000000,
+    },
+}
+# Запас на шум: время считается регрессией, только если оно
+# хуже и в долях, и в миллисекундах.
+MIN_SLOWDOWN_MS = 1.0
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def prepare(size):
+    """Наполняет базу и возвращает данные для сценариев."""
+    from django.core.management import call_command
+    from django.db.models import Count
+
+    from api.v1.authentication import get_access_token
+    from reviews.models import Review, Title
+    from user.models import User, UserRole
+
+    call_command('generatedata', stdout=io.StringIO(), **SIZES[size])
+    admin = User.objects.create(
+        username='bench-admin', email='bench-admin@yamdb.fake',
+        role=UserRole.ADMIN, confirmation_code='bench-code',
+    )
+    title = Title.objects.order_by('-score_count').first()
+    review = (
+        Review.objects.filter(title=title)
+        .annotate(count=Count('comments')).order_by('-count').first()
+    )
+    word = title.name.split()[0]
+    return {
+        'admin': admin,
+        'token': str(get_access_token(admin)),
+        'title': title,
+        'review': review,
+        'word': word,
+        'genre': title.genre.values_list('slug', flat=True).first(),
+        'category': title.category.slug,
+        'user': User.objects.exclude(pk=admin.pk).first(),
+    }
+
+
+def scenarios(data):
+    """Сценарии: имя, метод, url, тело запроса, нужна ли авторизация.
+
+    Тело может быть функцией от номера запроса, чтобы запросы
+    на создание не упирались в уникальность.
+    """
+    title = f'/api/v1/titles/{data["title"].pk}/'
+    reviews = f'{title}reviews/'
+    comments = f'{reviews}{data["review"].pk}/comments/'
+    return (
+        ('titles-list', 'get', '/api/v1/titles/', None, False),
+        ('titles-list-filter', 'get',
+         f'/api/v1/titles/?genre={data["genre"]}'
+         f'&category={data["category"]}', None, False),
+        ('titles-search', 'get',
+         f'/api/v1/titles/?search={data["word"]}', None, False),
+        ('titles-cursor', 'get',
+         '/api/v1/titles/?cursor=', None, False),
+        ('titles-facets', 'get', '/api/v1/titles/facets/', None, False),
+        ('titles-detail', 'get', title, None, False),
+        ('titles-stats', 'get', f'{title}stats/', None, False),
+        ('categories-list', 'get', '/api/v1/categories/', None, False),
+        ('genres-list', 'get', '/api/v1/genres/', None, False),
+        ('reviews-list', 'get', reviews, None, False),
+        ('reviews-detail', 'get',
+         f'{reviews}{data["review"].pk}/', None, False),
+        ('comments-list', 'get', comments, None, False),
+        ('comments-create', 'post', comments,
+         lambda number: {'text': f'Комментарий {number}'}, True),
+        ('users-list', 'get', '/api/v1/users/', None, True),
+        ('users-detail', 'get',
+         f'/api/v1/users/{data["user"].username}/', None, True),
+        ('users-me', 'get', '/api/v1/users/me/', None, True),
+        ('auth-signup', 'post', '/api/v1/auth/signup/',
+         lambda number: {
+             'username': f'bench{number}',
+             'email': f'bench{number}@yamdb.fake',
+         }, False),
+        ('auth-token', 'post', '/api/v1/auth/token/',
+         lambda number: {
+             'username': data['admin'].username,
+             'confirmation_code': data['admin'].confirmation_code,
+         }, False),
+    )
+
+
+def measure(client, method, url, body, headers, repeat, numbers):
+    """Замеряет один сценарий, возвращает метрики."""
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def call():
+        cache.clear()
+        kwargs = dict(headers)
+        if body is not None:
+            kwargs['data'] = json.dumps(body(next(numbers)))
+            kwargs['content_type'] = 'application/json'
+        started = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+        return response
+
+    timings = []
+    response = call()
+    if response.status_code >= 400:
+        raise RuntimeError(f'{method.upper()} {url}: {response.status_code}')
+    with CaptureQueriesContext(connection) as captured:
+        call()
+    # Список запросов читается из лога соединения, который очищается
+    # в начале следующего запроса, поэтому считаем сразу.
+    queries = len(captured)
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings.clear()
+    for _ in range(repeat):
+        call()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': queries,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def compare(result, baseline, tolerance):
+    """Список регрессий сценария относительно базовой линии."""
+    problems = []
+    if result['queries'] > baseline['queries']:
+        problems.append(
+            f'запросов {baseline["queries"]} -> {result["queries"]}',
+        )
+    # Одиночный выброс двигает только p95, поэтому время считается
+    # регрессией, когда хуже стали и p50, и p95.
+    if all(
+        result[key] > baseline[key] * (1 + tolerance)
+        and result[key] - baseline[key] > MIN_SLOWDOWN_MS
+        for key in ('p50_ms', 'p95_ms')
+    ):
+        problems.append(
+            f'p50/p95 {baseline["p50_ms"]}/{baseline["p95_ms"]} -> '
+            f'{result["p50_ms"]}/{result["p95_ms"]} мс',
+        )
+    if result['peak_kib'] > baseline['peak_kib'] * (1 + tolerance):
+        problems.append(
+            f'память {baseline["peak_kib"]} -> {result["peak_kib"]} КиБ',
+        )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        '--sizes', nargs='+', choices=SIZES, default=['small'],
+    )
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    results = {}
+    regressions = 0
+    for size in args.sizes:
+        with benchmark_database():
+            data = prepare(size)
+            client = Client()
+            auth = {'HTTP_AUTHORIZATION': f'Bearer {data["token"]}'}
+            numbers = itertools.count()
+            results[size] = {}
+            print(f'\nНабор {size}: {SIZES[size]}')
+            print(f'{"сценарий":<22}{"p50, мс":>10}{"p95, мс":>10}'
+                  f'{"запросов":>10}{"память, КиБ":>14}')
+            for name, method, url, body, needs_auth in scenarios(data):
+                result = measure(
+                    client, method, url, body, auth if needs_auth else {},
+                    args.repeat, numbers,
+                )
+                results[size][name] = result
+                problems = compare(
+                    result, baseline.get(size, {}).get(name, result),
+                    args.tolerance,
+                )
+                regressions += bool(problems)
+                print(f'{name:<22}{result["p50_ms"]:>10}'
+                      f'{result["p95_ms"]:>10}{result["queries"]:>10}'
+                      f'{result["peak_kib"]:>14}'
+                      + (f'  РЕГРЕССИЯ: {"; ".join(problems)}'
+                         if problems else ''))
+    if args.save_baseline:
+        baseline.update(results)
+        args.baseline.write_text(
+            json.dumps(baseline, ensure_ascii=False, indent=4) + '\n',
+            encoding='utf-8',
+        )
+        print(f'\nБазовая линия сохранена в {args.baseline}')
+    elif regressions:
+        print(f'\nСценариев с регрессией: {regressions}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Сравнение importcsv в один процесс и с пулом (--workers N).
+
+Генерирует csv в формате static/data и загружает их в чистую базу
+при каждом числе процессов. Запуск из корня репозитория:
+    python -m benchmarks.bench_importcsv --titles 100000 --workers 1 4
+"""
+import argparse
+import csv
+import io
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import benchmark_database, setup_django
+
+USERS = 1000
+CATEGORIES = 10
+GENRES = 30
+
+
+def write_csv(path, header, rows):
+    with open(path, encoding='utf-8', mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate_files(directory, titles, reviews_per_title, seed=42):
+    """Пишет csv для всех моделей; возвращает пары (путь, модель)."""
+    from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                                Title, User)
+
+    rnd = random.Random(seed)
+    pub_date = '2020-01-13T23:20:02.422Z'
+    files = (
+        ('category.csv', Category, ('id', 'name', 'slug'), (
+            (i, f'Категория {i}', f'category-{i}')
+            for i in range(1, CATEGORIES + 1)
+        )),
+        ('genre.csv', Genre, ('id', 'name', 'slug'), (
+            (i, f'Жанр {i}', f'genre-{i}') for i in range(1, GENRES + 1)
+        )),
+        ('users.csv', User, ('id', 'username', 'email', 'role'), (
+            (i, f'user{i}', f'user{i}@yamdb.fake', 'user')
+            for i in range(1, USERS + 1)
+        )),
+        ('titles.csv', Title, ('id', 'name', 'year', 'category'), (
+            (i, f'Тайтл {i}', rnd.randint(1900, 2022),
+             rnd.randint(1, CATEGORIES))
+            for i in range(1, titles + 1)
+        )),
+        ('genre_title.csv', GenreTitle, ('id', 'title_id', 'genre_id'), (
+            (i, i, rnd.randint(1, GENRES)) for i in range(1, titles + 1)
+        )),
+        ('review.csv', Review,
+         ('id', 'title_id', 'text', 'author', 'score', 'pub_date'), (
+             (title * reviews_per_title + j + 1, title + 1,
+              f'Отзыв {j} на тайтл {title + 1}',
+              (title + j) % USERS + 1, rnd.randint(1, 10), pub_date)
+             for title in range(titles) for j in range(reviews_per_title)
+         )),
+        ('comments.csv', Comment,
+         ('id', 'review_id', 'text', 'author', 'pub_date'), (
+             (i, i, f'Комментарий {i}', rnd.randint(1, USERS), pub_date)
+             for i in range(1, titles + 1)
+         )),
+    )
+    result = {}
+    for filename, model, header, rows in files:
+        path = Path(directory) / filename
+        write_csv(path, header, rows)
+        result[path] = model
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100_000)
+    parser.add_argument('--reviews-per-title', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    from reviews.management.commands import importcsv
+
+    with tempfile.TemporaryDirectory() as directory:
+        importcsv.model_csv_equal = generate_files(
+            directory, args.titles, args.reviews_per_title,
+        )
+        rows = args.titles * (args.reviews_per_title + 3) + USERS
+        print(f'Строк во всех файлах: {rows}')
+        print(f'{"процессов":<12}{"время, с":>10}{"строк/с":>12}')
+        for workers in args.workers:
+            with benchmark_database():
+                start = time.perf_counter()
+                call_command(
+                    'importcsv', workers=workers,
+                    chunk_size=args.chunk_size,
+                    checkpoint=Path(directory) / 'checkpoint.json',
+                    stdout=io.StringIO(),
+                )
+                elapsed = time.perf_counter() - start
+            print(f'{workers:<12}{elapsed:>10.1f}{rows / elapsed:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
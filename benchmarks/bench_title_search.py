@@ -0,0 +1,95 @@
+"""Сравнение поиска тайтлов: name__icontains против FTS5 (?search=).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_title_search --titles 1000000
+"""
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks.utils import benchmark_database, setup_django, timeit
+
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'тер', 'на', 'вой', 'ло', 'гор', 'ре', 'ша',
+    'зве', 'да', 'ту', 'ле', 'ген', 'мор', 'ни', 'бо', 'сте', 'ль',
+)
+VOCABULARY_SIZE = 5000
+
+
+def build_vocabulary(rnd):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rnd.choices(SYLLABLES, k=rnd.randint(2, 4))))
+    words = sorted(words)
+    cum_weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, len(words) + 1)
+    ))
+    return words, cum_weights
+
+
+def fill_titles(count, batch_size=10000, seed=42):
+    from reviews.models import Title
+
+    rnd = random.Random(seed)
+    words, cum_weights = build_vocabulary(rnd)
+    for start in range(0, count, batch_size):
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(
+                    rnd.choices(words, cum_weights=cum_weights, k=3),
+                ).capitalize(),
+                year=rnd.randint(1900, 2022),
+                description=' '.join(
+                    rnd.choices(words, cum_weights=cum_weights, k=12),
+                ),
+            )
+            for _ in range(min(batch_size, count - start))
+        )
+    return words
+
+
+def build_queries(words):
+    """Частое, среднее и редкое слово, префикс, два слова, ВЕРХНИЙ регистр."""
+    return (
+        words[0],
+        words[100],
+        words[-1],
+        words[200][:3],
+        f'{words[5]} {words[50]}',
+        words[300].upper(),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from api.v1.filters import TitleFilter
+    from reviews.models import Title
+
+    with benchmark_database():
+        start = time.perf_counter()
+        words = fill_titles(args.titles)
+        print(f'Тайтлов: {args.titles}, наполнение '
+              f'{time.perf_counter() - start:.1f} с')
+        print(f'{"запрос":<20}{"icontains, мс":>16}{"найдено":>10}'
+              f'{"fts5, мс":>12}{"найдено":>10}')
+        for text in build_queries(words):
+            like = Title.objects.filter(name__icontains=text)
+            fts = TitleFilter(
+                {'search': text}, queryset=Title.objects.all(),
+            ).qs
+            like_ms = timeit(
+                lambda: list(like.order_by('name')[:10]), args.repeat,
+            )
+            fts_ms = timeit(lambda: list(fts[:10]), args.repeat)
+            print(f'{text:<20}{like_ms:>16.1f}{like.count():>10}'
+                  f'{fts_ms:>12.1f}{fts.count():>10}')
+
+
+if __name__ == '__main__':
+    main()
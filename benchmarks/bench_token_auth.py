@@ -0,0 +1,82 @@
+"""Время аутентификации запроса по JWT без кеша токенов и с ним.
+
+Запросы идут с --tokens разными токенами, популярность токенов
+распределена по Ципфу, как у активных пользователей. Замеряется
+YamdbJWTAuthentication.authenticate без обращения к базе.
+Запуск из корня репозитория:
+    python -m benchmarks.bench_token_auth --tokens 100 5000 --cache-size 1000
+"""
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks.utils import setup_django
+
+
+def make_requests(tokens, requests, seed=42):
+    """Запросы с заголовком Authorization для tokens пользователей."""
+    from rest_framework.test import APIRequestFactory
+
+    from api.v1.authentication import get_access_token
+    from user.models import User
+
+    factory = APIRequestFactory()
+    headers = [
+        f'Bearer {get_access_token(User(id=pk, username=f"user{pk}"))}'
+        for pk in range(1, tokens + 1)
+    ]
+    cum_weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, tokens + 1)
+    ))
+    rnd = random.Random(seed)
+    return [
+        factory.get('/api/v1/titles/', HTTP_AUTHORIZATION=header)
+        for header in rnd.choices(headers, cum_weights=cum_weights,
+                                  k=requests)
+    ]
+
+
+def measure(requests, cache_size):
+    """Среднее время аутентификации в микросекундах и доля попаданий."""
+    from django.conf import settings
+
+    from api.metrics import registry
+    from api.v1.authentication import YamdbJWTAuthentication, token_cache
+
+    settings.TOKEN_CACHE_SIZE = cache_size
+    token_cache.clear()
+    registry.reset()
+    authentication = YamdbJWTAuthentication()
+    started = time.perf_counter()
+    for request in requests:
+        authentication.authenticate(request)
+    elapsed = time.perf_counter() - started
+    hits = registry.counters.get((
+        'yamdb_cache_requests_total', (('cache', 'token'), ('result', 'hit')),
+    ), 0)
+    return elapsed / len(requests) * 10 ** 6, hits / len(requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument('--tokens', type=int, nargs='+', default=[100, 5000])
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--cache-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    print(f'{"токенов":>8}{"без кеша, мкс":>16}{"с кешем, мкс":>15}'
+          f'{"попаданий":>12}')
+    for tokens in args.tokens:
+        requests = make_requests(tokens, args.requests)
+        without_cache, _ = measure(requests, 0)
+        with_cache, hit_rate = measure(requests, args.cache_size)
+        print(f'{tokens:>8}{without_cache:>16.1f}{with_cache:>15.1f}'
+              f'{hit_rate:>12.1%}')
+
+
+if __name__ == '__main__':
+    main()
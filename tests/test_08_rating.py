@@ -0,0 +1,237 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAPI:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_writes(self, admin_client, user_client,
+                                             moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        create_single_review(admin_client, title_id, 'Хорошо', 8)
+        review = create_single_review(user_client, title_id, 'Плохо', 2)
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг тайтла пересчитывается при создании '
+            'отзыва.'
+        )
+
+        review_id = review.json()['id']
+        response = user_client.patch(f'{url}{review_id}/', data={'score': 6})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг тайтла пересчитывается при изменении '
+            'оценки в отзыве.'
+        )
+
+        response = moderator_client.delete(f'{url}{review_id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 8, (
+            'Проверьте, что рейтинг тайтла пересчитывается при удалении '
+            'отзыва.'
+        )
+
+    def test_02_rating_follows_cascade_delete(self, admin_client,
+                                              user_client, user):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Хорошо', 9)
+        create_single_review(user_client, title_id, 'Плохо', 1)
+
+        user.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.score_count) == (9, 1), (
+            'Проверьте, что счётчики оценок тайтла пересчитываются при '
+            'каскадном удалении отзывов вместе с автором.'
+        )
+        assert title.rating == 9
+
+    def test_03_rebuildratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Хорошо', 10)
+        create_single_review(user_client, title_id, 'Средне', 5)
+        Title.objects.update(score_sum=0, score_count=0, rating=None)
+
+        call_command('rebuildratings', chunk_size=1)
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.score_count) == (15, 2), (
+            'Проверьте, что команда `rebuildratings` восстанавливает '
+            'счётчики оценок тайтла.'
+        )
+        assert title.rating == 7.5
+        assert Title.objects.get(pk=titles[1]['id']).rating is None
+
+    def test_04_score_histogram(self, admin_client, user_client,
+                                moderator_client, client,
+                                django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/stats/'
+        create_single_review(admin_client, title_id, 'Хорошо', 8)
+        review = create_single_review(user_client, title_id, 'Плохо', 2)
+        create_single_review(moderator_client, title_id, 'Отлично', 8)
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/',
+            data={'score': 3},
+        )
+
+        with django_assert_max_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        histogram = {row['score']: row['count']
+                     for row in data['score_histogram']}
+        expected = {score: 0 for score in range(1, 11)}
+        expected.update({3: 1, 8: 2})
+        assert histogram == expected, (
+            f'Проверьте, что `{url}` возвращает распределение оценок, '
+            'учитывающее создание и изменение отзывов.'
+        )
+        assert data['score_count'] == 3
+
+        moderator_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/',
+        )
+        from reviews.models import Title
+
+        Title.objects.update(score_8=0)
+        call_command('rebuildratings')
+        data = client.get(url).json()
+        histogram = {row['score']: row['count']
+                     for row in data['score_histogram']}
+        expected[3] = 0
+        assert histogram == expected, (
+            'Проверьте, что удаление отзыва и команда `rebuildratings` '
+            'обновляют гистограмму оценок.'
+        )
+
+    def test_05_rating_follows_orm_writes(self, admin_client, user):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        first, second = (title['id'] for title in titles)
+
+        def counters(title_id):
+            title = Title.objects.get(pk=title_id)
+            return title.score_sum, title.score_count, title.rating
+
+        review = Review.objects.create(
+            title_id=first, author=user, text='Из shell', score=4,
+        )
+        assert counters(first) == (4, 1, 4), (
+            'Проверьте, что отзыв, созданный через ORM, учитывается '
+            'в счётчиках тайтла.'
+        )
+        review = Review.objects.get(pk=review.pk)
+        review.score = 9
+        review.save()
+        assert counters(first) == (9, 1, 9)
+        review.title_id = second
+        review.save()
+        assert counters(first) == (0, 0, None)
+        assert counters(second) == (9, 1, 9), (
+            'Проверьте, что перенос отзыва на другой тайтл переносит '
+            'оценку.'
+        )
+        Review(pk=review.pk, title_id=second, author=user, text='Вручную',
+               score=2, pub_date=review.pub_date).save()
+        assert counters(second) == (2, 1, 2)
+        Review.objects.get(pk=review.pk).delete()
+        assert counters(second) == (0, 0, None), (
+            'Проверьте, что удаление отзыва, созданного через ORM, '
+            'не уводит счётчики в минус.'
+        )
+
+    def test_06_title_delete_skips_counter_updates(self, admin_client,
+                                                   django_user_model):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        first, second = (title['id'] for title in titles)
+        for number in range(5):
+            author = django_user_model.objects.create_user(
+                username=f'author{number}',
+                email=f'author{number}@yamdb.fake',
+            )
+            Review.objects.create(
+                title_id=first, author=author, text='Отзыв', score=5,
+            )
+        Review.objects.create(
+            title_id=second, author=author, text='Отзыв', score=7,
+        )
+        with CaptureQueriesContext(connection) as captured:
+            response = admin_client.delete(f'/api/v1/titles/{first}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        updates = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert not updates, (
+            'Проверьте, что при удалении тайтла каскадное удаление его '
+            'отзывов не обновляет счётчики удаляемого тайтла.'
+        )
+        title = Title.objects.get(pk=second)
+        assert (title.score_sum, title.score_count) == (7, 1)
+        Review.objects.get(title_id=second).delete()
+        title.refresh_from_db()
+        assert title.score_count == 0, (
+            'Проверьте, что после удаления тайтла отзывы других тайтлов '
+            'по-прежнему сдвигают счётчики.'
+        )
+
+    def test_07_old_score_is_read_in_transaction(self, admin_client,
+                                                 user_client, monkeypatch):
+        from django.db import connection
+
+        from api.v1.views import ReviewViewSet
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отзыв', 5,
+        ).json()['id']
+        url = f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+        get_object = ReviewViewSet.get_object
+        in_transaction = []
+
+        def watched_get_object(view):
+            # Иначе параллельная правка между чтением и записью
+            # вычла бы из счётчиков ту же старую оценку.
+            in_transaction.append(connection.in_atomic_block)
+            return get_object(view)
+
+        monkeypatch.setattr(ReviewViewSet, 'get_object', watched_get_object)
+        response = user_client.patch(url, data={'score': 8})
+        assert response.status_code == HTTPStatus.OK
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.score_5, title.score_8) == (8, 0, 1)
+        response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.score_count, title.score_8) == (
+            0, 0, 0,
+        )
+        assert in_transaction == [True, True], (
+            'Проверьте, что правка и удаление отзыва читают его старую '
+            'оценку внутри транзакции, которая сдвигает счётчики.'
+        )
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+TITLE_LIST_QUERIES = 3
+TITLE_DETAIL_QUERIES = 2
+
+
+@pytest.fixture
+def many_titles(db):
+    from reviews.models import Category, Genre, GenreTitle, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(5)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(5)
+    ]
+    Title.objects.bulk_create(
+        Title(
+            name=f'Тайтл {idx:04}',
+            year=2000,
+            category=categories[idx % len(categories)],
+        )
+        for idx in range(500)
+    )
+    titles = Title.objects.order_by('id')
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genres[(title.id + shift) % 5])
+        for title in titles
+        for shift in range(2)
+    )
+    return list(titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('limit', (10, 100, 500))
+    def test_01_title_list_query_budget(self, client, many_titles,
+                                        django_assert_num_queries, limit):
+        with django_assert_num_queries(TITLE_LIST_QUERIES):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == limit
+        assert all(len(title['genre']) == 2 for title in results), (
+            'Проверьте, что в ответе на GET-запрос к `/api/v1/titles/` '
+            'у каждого тайтла выводятся его жанры.'
+        )
+
+    def test_02_title_detail_query_budget(self, client, many_titles,
+                                          django_assert_num_queries):
+        title = many_titles[0]
+        with django_assert_num_queries(TITLE_DETAIL_QUERIES):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['category'] is not None
@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+def walk_cursor(client, url):
+    results = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в курсорном режиме пагинации `count` не '
+            'вычисляется.'
+        )
+        results.extend(data['results'])
+        if not data['next']:
+            return results
+        response = client.get(data['next'])
+
+
+def page_query_plans(client, url):
+    """Запросы страницы, на которую ведёт ссылка url, с их планами."""
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as captured:
+        client.get(url)
+    plans = []
+    with connection.cursor() as cursor:
+        for query in captured.captured_queries:
+            if 'ORDER BY' not in query['sql']:
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            plans.append((
+                query['sql'],
+                ' '.join(row[-1] for row in cursor.fetchall()),
+            ))
+    return plans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Тайтл {idx % 7}', year=2000) for idx in range(25)
+        )
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True),
+        )
+        results = walk_cursor(client, '/api/v1/titles/?cursor=&limit=10')
+        assert [title['id'] for title in results] == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` отдаёт '
+            'все тайтлы в порядке name, id без пропусков и повторов.'
+        )
+
+    def test_02_reviews_cursor(self, admin_client, user_client,
+                               moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for idx, client in enumerate(
+            (admin_client, user_client, moderator_client), 1,
+        ):
+            create_single_review(client, titles[0]['id'], f'Отзыв {idx}', 5)
+
+        expected = [
+            review['id']
+            for review in admin_client.get(url).json()['results']
+        ]
+        results = walk_cursor(admin_client, f'{url}?cursor=&limit=2')
+        assert [review['id'] for review in results] == expected, (
+            'Проверьте, что курсорная пагинация отзывов отдаёт их '
+            'в порядке убывания даты публикации.'
+        )
+
+    def test_03_limit_offset_is_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `cursor` используется пагинация '
+            'limit/offset.'
+        )
+
+    def test_04_titles_cursor_keyset(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Тайтл {idx % 2}', year=2000) for idx in range(25)
+        )
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True),
+        )
+        url = '/api/v1/titles/?cursor=&limit=10'
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                data = client.get(url).json()
+            assert not any(
+                'OFFSET' in query['sql']
+                for query in captured.captured_queries
+            ), (
+                'Проверьте, что курсор тайтлов идёт по (name, id), а не '
+                'пропускает одинаковые имена смещением.'
+            )
+            pages.append([title['id'] for title in data['results']])
+            url = data['next']
+        assert sum(pages, []) == expected
+
+        previous = client.get(data['previous']).json()
+        assert [title['id'] for title in previous['results']] == pages[-2], (
+            'Проверьте, что ссылка previous курсора тайтлов ведёт на '
+            'предыдущую страницу.'
+        )
+
+    def test_05_cursor_uses_index_range(self, admin_client, user_client,
+                                        moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for idx, client in enumerate(
+            (admin_client, user_client, moderator_client), 1,
+        ):
+            create_single_review(client, titles[0]['id'], f'Отзыв {idx}', 5)
+        for url, columns, ranges in (
+            ('/api/v1/titles/?cursor=&limit=1',
+             '("reviews_title"."name", "reviews_title"."id")',
+             ('name>?', 'name<?')),
+            (f'{reviews}?cursor=&limit=1',
+             '("reviews_review"."pub_date", "reviews_review"."id")',
+             ('title_id=? AND pub_date<?', 'title_id=? AND pub_date>?')),
+        ):
+            next_url = admin_client.get(url).json()['next']
+            previous_url = admin_client.get(next_url).json()['previous']
+            for link, bound in zip((next_url, previous_url), ranges):
+                plans = page_query_plans(admin_client, link)
+                assert any(
+                    f'({bound})' in plan and f'{columns} ' in sql
+                    for sql, plan in plans
+                ), (
+                    'Проверьте, что страница курсора выбирается сравнением '
+                    'строк значений по полям порядка и диапазоном индекса: '
+                    f'{plans}'
+                )
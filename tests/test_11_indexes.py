@@ -0,0 +1,49 @@
+import pytest
+
+
+def query_plan(queryset):
+    return queryset.explain()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Indexes:
+
+    @pytest.mark.parametrize('model_name, lookup, index_name', (
+        ('Review', {'title_id': 1}, 'review_title_pub_date_idx'),
+        ('Review', {'author_id': 1}, 'review_author_pub_date_idx'),
+        ('Comment', {'review_id': 1}, 'comment_review_pub_date_idx'),
+        ('Comment', {'author_id': 1}, 'comment_author_pub_date_idx'),
+    ))
+    def test_01_pub_date_ordering_uses_index(self, model_name, lookup,
+                                             index_name):
+        from reviews import models
+
+        model = getattr(models, model_name)
+        for ordering in (('-pub_date',), ('-pub_date', '-id')):
+            plan = query_plan(model.objects.filter(**lookup).order_by(
+                *ordering,
+            ))
+            assert index_name in plan, (
+                f'Проверьте, что выборка {model_name} по {lookup} '
+                f'использует индекс `{index_name}`. План: {plan}'
+            )
+            assert 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что сортировка {model_name} по {ordering} '
+                f'не требует временного B-дерева. План: {plan}'
+            )
+
+    def test_02_title_cursor_ordering_uses_index(self):
+        from reviews.models import Title
+
+        plan = query_plan(Title.objects.order_by('name', 'id'))
+        assert 'title_name_id_idx' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
+
+    def test_03_genre_prefetch_uses_index(self):
+        from reviews.models import Genre
+
+        plan = query_plan(Genre.objects.filter(titles__in=(1, 2, 3)))
+        assert 'genretitle_title_genre_idx' in plan, (
+            'Проверьте, что выборка жанров тайтлов использует индекс '
+            f'`genretitle_title_genre_idx`. План: {plan}'
+        )
@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    def search(self, client, text):
+        response = client.get('/api/v1/titles/', {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_folds_cyrillic_case(self, admin_client, client):
+        create_titles(admin_client)
+        assert self.search(client, 'ТЕРМИНАТОР') == ['Терминатор'], (
+            'Проверьте, что поиск `?search=` по `/api/v1/titles/` '
+            'не зависит от регистра кириллицы.'
+        )
+        assert self.search(client, 'крепк') == ['Крепкий орешек'], (
+            'Проверьте, что поиск `?search=` находит тайтлы по началу слова.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что поиск `?search=` ищет и по описанию тайтла.'
+        )
+        assert self.search(client, '"*)(') == []
+
+    def test_02_search_is_ranked_and_synced(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[1]["id"]}/'
+        response = admin_client.patch(
+            url, data={'description': 'Терминатор терминатор терминатор'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.search(client, 'терминатор') == [
+            'Терминатор', 'Крепкий орешек',
+        ], (
+            'Проверьте, что результаты `?search=` упорядочены по '
+            'релевантности и индекс обновляется при изменении тайтла.'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.search(client, 'терминатор') == ['Крепкий орешек']
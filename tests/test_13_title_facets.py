@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/facets/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleFacets:
+
+    def test_01_facets(self, admin_client, client,
+                       django_assert_max_num_queries):
+        create_titles(admin_client)
+        with django_assert_max_num_queries(4):
+            response = client.get(URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{URL}` возвращает ответ со статусом 200.'
+        )
+        assert response.json() == {
+            'count': 2,
+            'genre': [
+                {'slug': 'comedy', 'count': 1},
+                {'slug': 'drama', 'count': 1},
+                {'slug': 'horror', 'count': 1},
+            ],
+            'category': [
+                {'slug': 'books', 'count': 1},
+                {'slug': 'films', 'count': 1},
+            ],
+            'year': [
+                {'year': 1984, 'count': 1},
+                {'year': 1988, 'count': 1},
+            ],
+        }
+
+    def test_02_facets_use_title_filter(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get(URL, {'genre': 'horror'})
+        assert response.json() == {
+            'count': 1,
+            'genre': [
+                {'slug': 'comedy', 'count': 1},
+                {'slug': 'horror', 'count': 1},
+            ],
+            'category': [{'slug': 'films', 'count': 1}],
+            'year': [{'year': 1984, 'count': 1}],
+        }, (
+            f'Проверьте, что `{URL}` принимает те же параметры фильтрации, '
+            'что и `/api/v1/titles/`.'
+        )
+        response = client.get(URL, {'search': 'орешек'})
+        assert response.json()['count'] == 1
@@ -0,0 +1,123 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    def test_01_repeated_list_hits_cache(self, admin_client, client,
+                                         django_assert_num_queries):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/genres/',
+                    '/api/v1/categories/', '/api/v1/titles/facets/'):
+            first = client.get(url)
+            with django_assert_num_queries(0):
+                second = client.get(url)
+            assert second.status_code == HTTPStatus.OK
+            assert second.json() == first.json(), (
+                f'Проверьте, что повторный GET-запрос к `{url}` отдаёт '
+                'закэшированный ответ без обращения к базе.'
+            )
+
+    def test_02_writes_invalidate_cache(self, admin_client, client,
+                                        user_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        client.get(url)
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        ratings = {
+            title['id']: title['rating']
+            for title in client.get(url).json()['results']
+        }
+        assert ratings[titles[0]['id']] == 9, (
+            'Проверьте, что создание отзыва инвалидирует кэш списка тайтлов.'
+        )
+
+        admin_client.patch(
+            f'{url}{titles[1]["id"]}/', data={'genre': [genres[0]['slug']]},
+        )
+        title = next(
+            title for title in client.get(url).json()['results']
+            if title['id'] == titles[1]['id']
+        )
+        assert [genre['slug'] for genre in title['genre']] == [
+            genres[0]['slug'],
+        ], 'Проверьте, что смена жанров тайтла инвалидирует кэш.'
+
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == len(categories) - 1
+        title = next(
+            title for title in client.get(url).json()['results']
+            if title['id'] == titles[0]['id']
+        )
+        assert title['category'] is None, (
+            'Проверьте, что удаление категории инвалидирует кэш тайтлов.'
+        )
+
+    def test_03_query_params_are_part_of_key(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['count'] == 2
+        assert client.get(url, {'genre': 'drama'}).json()['count'] == 1
+
+    def test_04_host_and_scheme_are_part_of_key(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        client.get(url, {'limit': 1})
+        for host, secure in (('api.yamdb.fake', False),
+                             ('testserver', True)):
+            response = client.get(
+                url, {'limit': 1}, HTTP_HOST=host, secure=secure,
+            )
+            scheme = 'https' if secure else 'http'
+            assert response.json()['next'].startswith(
+                f'{scheme}://{host}/',
+            ), (
+                'Проверьте, что кэш не отдаёт ссылки пагинации, '
+                'построенные для другого хоста или схемы.'
+            )
+
+    def test_05_version_moves_after_commit(self, admin_client, client, user):
+        from django.db import connection, transaction
+
+        from api.v1.cache import get_versions
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        client.get(url)
+        version = get_versions([Title])
+        seen = {}
+
+        def concurrent_reader():
+            # Отдельный поток - отдельное соединение с базой.
+            try:
+                seen['version'] = get_versions([Title])
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            Review.objects.create(
+                title_id=titles[0]['id'], author=user, text='Отзыв',
+                score=9,
+            )
+            reader = threading.Thread(target=concurrent_reader)
+            reader.start()
+            reader.join()
+        assert seen['version'] == version, (
+            'Проверьте, что версия кэша сдвигается только после фиксации '
+            'транзакции: иначе параллельный читатель закэширует старые '
+            'строки под новой версией.'
+        )
+        assert get_versions([Title]) != version
+        ratings = {
+            title['id']: title['rating']
+            for title in client.get(url).json()['results']
+        }
+        assert ratings[titles[0]['id']] == 9
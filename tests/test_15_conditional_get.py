@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils.http import http_date
+
+from tests.utils import create_comments, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    def assert_not_modified(self, client, url, **headers):
+        response = client.get(url, **headers)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальными '
+            f'{list(headers)} возвращает ответ со статусом 304.'
+        )
+
+    def test_01_reviews_etag(self, admin_client, user_client, user, admin):
+        authors = {user: user_client, admin: admin_client}
+        reviews, titles = create_reviews(admin_client, authors)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = user_client.get(url)
+        etag = response['ETag']
+        assert etag.startswith('"'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'сильный ETag.'
+        )
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что список отдаёт только ETag: Last-Modified '
+            'не отражает удаления.'
+        )
+        self.assert_not_modified(user_client, url, HTTP_IF_NONE_MATCH=etag)
+
+        review_url = f'{url}{reviews[0]["id"]}/'
+        response = user_client.get(review_url)
+        detail_etag = response['ETag']
+        self.assert_not_modified(
+            user_client, review_url, HTTP_IF_NONE_MATCH=detail_etag,
+        )
+        self.assert_not_modified(
+            user_client, review_url,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+        admin_client.patch(review_url, data={'text': 'Новый текст'})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения отзыва старый ETag списка '
+            'отзывов больше не подходит.'
+        )
+        response = user_client.get(review_url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['text'] == 'Новый текст'
+
+        etag = user_client.get(url)['ETag']
+        response = admin_client.delete(f'{url}{reviews[1]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления отзыва старый ETag списка '
+            'отзывов больше не подходит.'
+        )
+
+    def test_02_comments_etag(self, admin_client, user_client, user, admin):
+        authors = {user: user_client, admin: admin_client}
+        comments, reviews, titles = create_comments(admin_client, authors)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        etag = user_client.get(url)['ETag']
+        self.assert_not_modified(user_client, url, HTTP_IF_NONE_MATCH=etag)
+        other_page = user_client.get(f'{url}?limit=1')
+        assert other_page['ETag'] != etag, (
+            'Проверьте, что ETag зависит от параметров запроса.'
+        )
+
+    def test_03_author_rename_changes_etag(self, admin_client, user_client,
+                                           user, admin):
+        authors = {user: user_client, admin: admin_client}
+        reviews, titles = create_reviews(admin_client, authors)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review_url = f'{url}{reviews[0]["id"]}/'
+        etags = {
+            target: user_client.get(target)['ETag']
+            for target in (url, review_url)
+        }
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'username': 'renamed'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        for target, etag in etags.items():
+            response = user_client.get(target, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что после смены имени автора старый ETag '
+                f'для `{target}` больше не подходит.'
+            )
+        assert response.json()['author'] == 'renamed'
+
+    def test_04_delete_with_if_modified_since(self, admin_client,
+                                              user_client, user, admin):
+        authors = {user: user_client, admin: admin_client}
+        reviews, titles = create_reviews(admin_client, authors)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        since = http_date()
+        response = admin_client.delete(f'{url}{reviews[1]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления отзыва список с одним '
+            'If-Modified-Since не отвечает 304.'
+        )
+        assert reviews[1]['id'] not in [
+            review['id'] for review in response.json()['results']
+        ]
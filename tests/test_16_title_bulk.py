@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+URL = '/api/v1/titles/bulk/'
+
+
+def make_items(count, genres, categories):
+    return [
+        {
+            'name': f'Тайтл {idx}',
+            'year': 2000 + idx % 20,
+            'genre': [genres[idx % len(genres)]['slug']],
+            'category': categories[idx % len(categories)]['slug'],
+            'description': f'Описание {idx}',
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleBulk:
+
+    def test_01_bulk_permissions(self, client, user_client):
+        responses = (
+            client.post(URL, data='[]', content_type='application/json'),
+            user_client.post(URL, data=[], format='json'),
+        )
+        for response in responses:
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN,
+            ), (
+                f'Проверьте, что POST-запрос к `{URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_02_bulk_reports_item_errors(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = make_items(3, genres, categories)
+        items[1]['genre'] = ['unknown']
+        items[2]['year'] = 3000
+        response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {} and 'year' in errors[2], (
+            f'Проверьте, что `{URL}` возвращает ошибки по каждому элементу.'
+        )
+
+        items[2]['year'] = 2000
+        response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {} and 'genre' in errors[1], errors
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 0, (
+            f'Проверьте, что при ошибке в пакете `{URL}` не сохраняет '
+            'ни одного произведения.'
+        )
+
+    def test_03_bulk_create_and_update(self, admin_client,
+                                       django_assert_max_num_queries):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = make_items(300, genres, categories)
+        # Вставки режутся на пачки лимитом параметров SQLite (999),
+        # а не по одной на произведение.
+        with django_assert_max_num_queries(15):
+            response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        created = response.json()
+        assert len(created) == 300
+
+        title = admin_client.get(f'/api/v1/titles/{created[5]["id"]}/').json()
+        assert title['name'] == items[5]['name']
+        assert [genre['slug'] for genre in title['genre']] == items[5]['genre']
+        assert title['category']['slug'] == items[5]['category']
+
+        update = {
+            'id': created[5]['id'],
+            'name': 'Новое имя',
+            'year': 1999,
+            'genre': [genres[0]['slug'], genres[2]['slug']],
+            'category': None,
+        }
+        response = admin_client.post(
+            URL, data=[update, make_items(1, genres, categories)[0]],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        title = admin_client.get(f'/api/v1/titles/{created[5]["id"]}/').json()
+        assert title['name'] == 'Новое имя'
+        assert title['category'] is None
+        assert sorted(genre['slug'] for genre in title['genre']) == sorted(
+            update['genre'],
+        )
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 301
+
+    def test_04_bulk_update_keeps_missing_fields(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = make_items(1, genres, categories)
+        response = admin_client.post(URL, data=items, format='json')
+        title_id = response.json()[0]['id']
+        response = admin_client.post(URL, data=[{
+            'id': title_id,
+            'name': 'Новое имя',
+            'genre': [genres[1]['slug']],
+        }], format='json')
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        assert response.json()[0]['description'] == items[0]['description']
+        title = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert title['name'] == 'Новое имя'
+        assert (
+            title['year'] == items[0]['year']
+            and title['description'] == items[0]['description']
+            and title['category']['slug'] == items[0]['category']
+        ), (
+            f'Проверьте, что `{URL}` не очищает поля, не переданные '
+            'при обновлении.'
+        )
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17SparseFields:
+
+    def test_01_titles_fields(self, admin_client, client,
+                              django_assert_num_queries):
+        create_titles(admin_client)
+        with django_assert_num_queries(2) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == HTTPStatus.OK
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                'Проверьте, что `?fields=` оставляет в ответе только '
+                'перечисленные поля.'
+            )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'description' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что `?fields=` не загружает из базы описание '
+            'и категорию тайтла.'
+        )
+
+    def test_02_titles_omit(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?omit=description,genre')
+        title = response.json()['results'][0]
+        assert set(title) == {'id', 'name', 'year', 'category', 'rating'}, (
+            'Проверьте, что `?omit=` убирает перечисленные поля из ответа.'
+        )
+        assert title['category'] is not None
+
+    def test_03_reviews_fields(self, admin_client, user_client, user,
+                               django_assert_max_num_queries):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_max_num_queries(5) as context:
+            response = user_client.get(f'{url}?fields=id,score')
+        assert response.json()['results'] == [
+            {'id': reviews[0]['id'], 'score': reviews[0]['score']},
+        ]
+        sql = context.captured_queries[-1]['sql']
+        assert '"text"' not in sql, (
+            'Проверьте, что `?fields=` без `text` откладывает загрузку '
+            'текста отзыва.'
+        )
+
+    def test_04_writes_ignore_fields(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/?fields=id',
+            data={'name': 'Терминатор 2'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Терминатор 2'
@@ -0,0 +1,365 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def csv_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ImportCsv:
+
+    def test_01_import_static_data(self):
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title, User)
+
+        output = io.StringIO()
+        call_command('importcsv', chunk_size=7, stdout=output)
+        expected = (
+            ('category.csv', Category),
+            ('genre.csv', Genre),
+            ('titles.csv', Title),
+            ('genre_title.csv', GenreTitle),
+            ('users.csv', User),
+            ('review.csv', Review),
+            ('comments.csv', Comment),
+        )
+        for filename, model in expected:
+            assert model.objects.count() == len(csv_rows(filename)), (
+                f'Проверьте, что команда `importcsv` загружает все строки '
+                f'из `{filename}`.'
+            )
+        assert 'строк/с' in output.getvalue()
+
+        review = csv_rows('review.csv')[0]
+        saved = Review.objects.get(pk=review['id'])
+        assert (saved.author_id, saved.title_id) == (
+            int(review['author']), int(review['title_id']),
+        )
+        assert saved.pub_date == parse_datetime(review['pub_date']), (
+            'Проверьте, что `importcsv` сохраняет даты из файла.'
+        )
+
+        title = Title.objects.get(pk=review['title_id'])
+        scores = [int(row['score']) for row in csv_rows('review.csv')
+                  if row['title_id'] == review['title_id']]
+        assert title.score_count == len(scores), (
+            'Проверьте, что после импорта пересчитываются рейтинги тайтлов.'
+        )
+        assert title.rating == sum(scores) / len(scores)
+
+    def test_02_import_is_idempotent(self):
+        from reviews.models import Review
+
+        call_command('importcsv', stdout=io.StringIO())
+        count = Review.objects.count()
+        output = io.StringIO()
+        call_command('importcsv', stdout=output, stderr=io.StringIO())
+        assert Review.objects.count() == count, (
+            'Проверьте, что повторный запуск `importcsv` не дублирует строки.'
+        )
+
+    def test_03_bad_rows_are_reported(self, tmp_path, monkeypatch):
+        from reviews.management.commands import importcsv
+        from reviews.models import Category, Title
+
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8',
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Первый,1994,1\n2,Второй,1995,42\n'
+            '3,Третий,,1\n',
+            encoding='utf-8',
+        )
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            tmp_path / 'category.csv': Category,
+            tmp_path / 'titles.csv': Title,
+        })
+        errors = io.StringIO()
+        call_command('importcsv', stdout=io.StringIO(), stderr=errors)
+        assert sorted(Title.objects.values_list('id', flat=True)) == [1, 3], (
+            'Проверьте, что `importcsv` сохраняет корректные строки пачки, '
+            'даже если в ней есть ошибочные.'
+        )
+        assert 'Ошибка в строке 2' in errors.getvalue()
+        assert Title.objects.get(pk=3).year is None
+
+    def test_04_resume_from_checkpoint(self, tmp_path, monkeypatch):
+        from reviews.management.commands import importcsv
+        from reviews.models import Category
+
+        rows = ''.join(f'{i},Категория {i},slug-{i}\n' for i in range(1, 11))
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n' + rows, encoding='utf-8',
+        )
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            tmp_path / 'category.csv': Category,
+        })
+        checkpoint = tmp_path / 'checkpoint.json'
+        save_chunk = importcsv.Command._save_chunk
+        saved = []
+
+        def failing_save_chunk(command, model, objects, batch_size):
+            if len(saved) == 2:
+                raise RuntimeError('Импорт прерван')
+            saved.append([obj.pk for obj in objects])
+            return save_chunk(command, model, objects, batch_size)
+
+        monkeypatch.setattr(
+            importcsv.Command, '_save_chunk', failing_save_chunk,
+        )
+        with pytest.raises(RuntimeError):
+            call_command(
+                'importcsv', chunk_size=3, checkpoint=checkpoint,
+                stdout=io.StringIO(),
+            )
+        assert Category.objects.count() == 6
+        assert checkpoint.exists(), (
+            'Проверьте, что `importcsv` сохраняет чекпоинт после каждой '
+            'пачки.'
+        )
+
+        saved.clear()
+        monkeypatch.setattr(
+            importcsv.Command, '_save_chunk',
+            lambda command, model, objects, batch_size: (
+                saved.append([obj.pk for obj in objects])
+                or save_chunk(command, model, objects, batch_size)
+            ),
+        )
+        call_command(
+            'importcsv', chunk_size=3, checkpoint=checkpoint, resume=True,
+            stdout=io.StringIO(),
+        )
+        assert saved == [[7, 8, 9], [10]], (
+            'Проверьте, что `importcsv --resume` продолжает импорт '
+            'со строки, следующей за последней сохранённой пачкой.'
+        )
+        assert Category.objects.count() == 10
+        assert not checkpoint.exists(), (
+            'Проверьте, что после успешного импорта чекпоинт удаляется.'
+        )
+
+    def test_05_resume_rejects_changed_file(self, tmp_path, monkeypatch):
+        from django.core.management.base import CommandError
+        from reviews.management.commands import importcsv
+        from reviews.models import Category
+
+        path = tmp_path / 'category.csv'
+        path.write_text('id,name,slug\n1,Фильм,movie\n', encoding='utf-8')
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {path: Category})
+        checkpoint = tmp_path / 'checkpoint.json'
+        checkpoint.write_text(
+            f'{{"{path}": {{"rows": 1, "position": 0, "size": 1, '
+            f'"mtime": 0, "done": false}}}}',
+            encoding='utf-8',
+        )
+        with pytest.raises(CommandError):
+            call_command(
+                'importcsv', checkpoint=checkpoint, resume=True,
+                stdout=io.StringIO(),
+            )
+
+    def test_06_import_with_workers(self, tmp_path, monkeypatch):
+        from reviews.management.commands import importcsv
+        from reviews.models import Category, Comment, Review, Title
+
+        files = {
+            os.path.join(DATA_DIR, filename): model
+            for filename, model in (
+                ('comments.csv', Comment),
+                ('review.csv', Review),
+                ('titles.csv', Title),
+                ('category.csv', Category),
+            )
+        }
+        files.update({
+            path: model for path, model in importcsv.model_csv_equal.items()
+            if model not in files.values()
+        })
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            settings.BASE_DIR / path: model for path, model in files.items()
+        })
+        output = io.StringIO()
+        call_command(
+            'importcsv', workers=2, chunk_size=10,
+            checkpoint=tmp_path / 'checkpoint.json', stdout=output,
+        )
+        assert Comment.objects.count() == len(csv_rows('comments.csv')), (
+            'Проверьте, что `importcsv --workers` загружает все строки '
+            'в порядке зависимостей между моделями, а не в порядке файлов.'
+        )
+        assert Review.objects.count() == len(csv_rows('review.csv'))
+        assert output.getvalue().index('Category') < (
+            output.getvalue().index('Title')
+        )
+
+    def test_07_invalid_values_are_reported(self, tmp_path, monkeypatch):
+        from reviews.management.commands import importcsv
+        from reviews.models import Category
+
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\nx,Книга,book\n', encoding='utf-8',
+        )
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            tmp_path / 'category.csv': Category,
+        })
+        errors = io.StringIO()
+        call_command(
+            'importcsv', workers=2, checkpoint=tmp_path / 'checkpoint.json',
+            stdout=io.StringIO(), stderr=errors,
+        )
+        assert list(Category.objects.values_list('slug', flat=True)) == [
+            'movie',
+        ]
+        assert 'Ошибка в строке x' in errors.getvalue(), (
+            'Проверьте, что `importcsv` сообщает о строках с некорректными '
+            'значениями.'
+        )
+
+    def test_08_dry_run_static_data(self, tmp_path):
+        from reviews.models import Comment, Title
+
+        output = io.StringIO()
+        call_command(
+            'importcsv', dry_run=True, workers=2,
+            report=tmp_path / 'report.jsonl', stdout=output,
+        )
+        assert 'Ошибок не найдено' in output.getvalue(), (
+            'Проверьте, что `importcsv --dry-run` не находит ошибок '
+            'в корректных файлах.'
+        )
+        assert not Title.objects.exists() and not Comment.objects.exists(), (
+            'Проверьте, что `importcsv --dry-run` ничего не пишет в базу.'
+        )
+
+    def test_09_dry_run_report(self, tmp_path, monkeypatch):
+        from django.core.management.base import CommandError
+        from reviews.management.commands import importcsv
+        from reviews.models import Category, Review, Title
+
+        Category.objects.create(id=5, name='Книга', slug='book')
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Первый,1994,5\n2,Второй,1995,42\n',
+            encoding='utf-8',
+        )
+        (tmp_path / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Отлично,1,11,2020-01-13T23:20:02.422Z\n'
+            '2,2,Хорошо,1,8,2020-01-13T23:20:02.422Z\n',
+            encoding='utf-8',
+        )
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            tmp_path / 'review.csv': Review,
+            tmp_path / 'titles.csv': Title,
+        })
+        report = tmp_path / 'report.jsonl'
+        with pytest.raises(CommandError, match='Ошибочных строк: 3'):
+            call_command(
+                'importcsv', dry_run=True, report=report,
+                stdout=io.StringIO(), stderr=io.StringIO(),
+            )
+        assert not Title.objects.exists(), (
+            'Проверьте, что `importcsv --dry-run` ничего не пишет в базу.'
+        )
+        with open(report, encoding='utf-8') as file:
+            errors = [json.loads(line) for line in file]
+        assert [(error['file'].rsplit('/', 1)[-1], error['row'])
+                for error in errors] == [
+            ('titles.csv', 2), ('review.csv', 1), ('review.csv', 2),
+        ], (
+            'Проверьте, что отчёт `importcsv --dry-run` содержит все '
+            'ошибочные строки с их номерами.'
+        )
+        assert set(errors[0]['errors']) == {'category'}
+        assert set(errors[1]['errors']) == {'score'}
+        assert set(errors[2]['errors']) == {'title', 'author'}
+        assert errors[1]['values']['score'] == '11'
+
+    def test_10_unique_conflicts_are_counted(self, tmp_path, monkeypatch):
+        from api.metrics import registry
+        from reviews.management.commands import importcsv
+        from reviews.models import Category, Review, Title, User
+
+        registry.reset()
+        Category.objects.create(id=1, name='Фильм', slug='movie')
+        Title.objects.create(id=1, name='Первый', year=1994, category_id=1)
+        User.objects.create(id=1, username='reader', email='r@yamdb.fake')
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n2,Кино,movie\n3,Книга,book\n', encoding='utf-8',
+        )
+        (tmp_path / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Отлично,1,9,2020-01-13T23:20:02.422Z\n'
+            '2,1,Ещё раз,1,3,2020-01-13T23:20:02.422Z\n',
+            encoding='utf-8',
+        )
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            tmp_path / 'category.csv': Category,
+            tmp_path / 'review.csv': Review,
+        })
+        output = io.StringIO()
+        call_command('importcsv', stdout=output, stderr=io.StringIO())
+        assert list(Review.objects.values_list('id', flat=True)) == [1]
+        assert 'Строк: 2. Успешно: 1. Конфликтов: 1.' in output.getvalue(), (
+            'Проверьте, что `importcsv` не считает успешными строки, '
+            'пропущенные из-за повтора уникальных значений.'
+        )
+        for model in ('reviews.category', 'reviews.review'):
+            labels = (('model', model), ('result', 'conflict'))
+            assert registry.counters[
+                ('yamdb_import_rows_total', labels)
+            ] == 1, 'Проверьте метрику строк, пропущенных как конфликты.'
+            assert registry.counters[('yamdb_import_rows_total', (
+                ('model', model), ('result', 'imported'),
+            ))] == 1
+
+    def test_11_dry_run_reports_unique_conflicts(self, tmp_path, monkeypatch):
+        from django.core.management.base import CommandError
+        from reviews.management.commands import importcsv
+        from reviews.models import Category, Review, Title, User
+
+        Category.objects.create(id=1, name='Фильм', slug='movie')
+        Title.objects.create(id=1, name='Первый', year=1994, category_id=1)
+        User.objects.create(id=1, username='reader', email='r@yamdb.fake')
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n2,Кино,movie\n3,Книга,book\n', encoding='utf-8',
+        )
+        (tmp_path / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Отлично,1,9,2020-01-13T23:20:02.422Z\n'
+            '2,1,Ещё раз,1,3,2020-01-13T23:20:02.422Z\n',
+            encoding='utf-8',
+        )
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            tmp_path / 'category.csv': Category,
+            tmp_path / 'review.csv': Review,
+        })
+        report = tmp_path / 'report.jsonl'
+        with pytest.raises(CommandError, match='Ошибочных строк: 2'):
+            call_command(
+                'importcsv', dry_run=True, report=report,
+                stdout=io.StringIO(), stderr=io.StringIO(),
+            )
+        with open(report, encoding='utf-8') as file:
+            errors = [json.loads(line) for line in file]
+        assert [(error['file'].rsplit('/', 1)[-1], error['row'],
+                 set(error['errors'])) for error in errors] == [
+            ('category.csv', 1, {'slug'}),
+            ('review.csv', 2, {'author,title'}),
+        ], (
+            'Проверьте, что `importcsv --dry-run` сообщает о строках, '
+            'которые импорт пропустил бы из-за повтора уникальных значений.'
+        )
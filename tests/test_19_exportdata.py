@@ -0,0 +1,64 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+def table(model):
+    names = [field.name for field in model._meta.concrete_fields]
+    return list(model.objects.order_by('pk').values_list(*names))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ExportData:
+
+    def test_01_csv_round_trip(self, tmp_path, monkeypatch):
+        from reviews.management.commands import importcsv
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title, User)
+
+        models = (Category, Genre, Title, GenreTitle, User, Review, Comment)
+        call_command('importcsv', stdout=io.StringIO())
+        before = {model: table(model) for model in models}
+        call_command(
+            'exportdata', output=tmp_path, chunk_size=10,
+            stdout=io.StringIO(),
+        )
+        with open(tmp_path / 'review.csv', encoding='utf-8') as file:
+            assert len(list(csv.reader(file))) == Review.objects.count() + 1
+
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        monkeypatch.setattr(importcsv, 'model_csv_equal', {
+            tmp_path / path.rsplit('/', 1)[-1]: model
+            for path, model in importcsv.model_csv_equal.items()
+        })
+        call_command(
+            'importcsv', checkpoint=tmp_path / 'checkpoint.json',
+            stdout=io.StringIO(),
+        )
+        for model in models:
+            assert table(model) == before[model], (
+                f'Проверьте, что `exportdata` выгружает {model.__name__} '
+                f'так, что `importcsv` загружает данные обратно без потерь.'
+            )
+
+    def test_02_jsonl_gzip(self, tmp_path):
+        from reviews.models import Category
+
+        Category.objects.create(name='Фильм', slug='movie')
+        Category.objects.create(name='Книга', slug='book')
+        call_command(
+            'exportdata', output=tmp_path, format='jsonl', gzip=True,
+            stdout=io.StringIO(),
+        )
+        with gzip.open(tmp_path / 'category.jsonl.gz', 'rt') as file:
+            rows = [json.loads(line) for line in file]
+        assert [row['slug'] for row in rows] == ['movie', 'book'], (
+            'Проверьте, что `exportdata --format jsonl --gzip` пишет '
+            'по объекту на строку в сжатый файл.'
+        )
+        assert (tmp_path / 'comments.jsonl.gz').exists()
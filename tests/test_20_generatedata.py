@@ -0,0 +1,89 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+SIZES = {
+    'users': 20, 'categories': 3, 'genres': 5, 'titles': 30,
+    'reviews': 300, 'comments': 200,
+}
+
+
+def generate(**options):
+    call_command(
+        'generatedata', stdout=io.StringIO(), chunk_size=50,
+        **{**SIZES, **options},
+    )
+
+
+def snapshot():
+    from reviews.models import Comment, GenreTitle, Review, Title, User
+
+    return {
+        model.__name__: list(
+            model.objects.order_by('pk').values_list(*(
+                field.attname for field in model._meta.concrete_fields
+                if field.name != 'updated'
+            )),
+        )
+        for model in (User, Title, GenreTitle, Review, Comment)
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20GenerateData:
+
+    def test_01_generate_sizes(self):
+        from django.db.models import Count, Sum
+        from reviews.models import Comment, Review, Title, User
+
+        generate()
+        assert User.objects.count() == SIZES['users']
+        assert Title.objects.count() == SIZES['titles']
+        assert Review.objects.count() == SIZES['reviews'], (
+            'Проверьте, что `generatedata` создаёт заданное число отзывов.'
+        )
+        assert Comment.objects.count() == SIZES['comments']
+        assert Title.objects.aggregate(
+            total=Sum('score_count'),
+        )['total'] == SIZES['reviews'], (
+            'Проверьте, что после генерации пересчитываются рейтинги.'
+        )
+        counts = sorted(
+            Title.objects.annotate(count=Count('reviews'))
+            .values_list('count', flat=True),
+            reverse=True,
+        )
+        assert counts[0] == SIZES['users'] and counts[-1] < counts[0] / 2, (
+            'Проверьте, что популярность тайтлов распределена по Ципфу.'
+        )
+        assert len(set(
+            Review.objects.values_list('pub_date', flat=True),
+        )) > 1
+
+    def test_02_generate_is_deterministic(self):
+        from reviews.models import Category, Genre, Title, User
+
+        generate(seed=7)
+        first = snapshot()
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        generate(seed=7)
+        assert snapshot() == first, (
+            'Проверьте, что `generatedata` с одним seed создаёт '
+            'один и тот же набор данных.'
+        )
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        generate(seed=8)
+        assert snapshot() != first
+
+    def test_03_too_many_reviews(self):
+        from django.core.management.base import CommandError
+        from reviews.models import User
+
+        with pytest.raises(CommandError):
+            generate(reviews=SIZES['users'] * SIZES['titles'] + 1)
+        assert not User.objects.exists(), (
+            'Проверьте, что `generatedata` проверяет параметры до записи.'
+        )
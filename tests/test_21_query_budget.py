@@ -0,0 +1,69 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+def count_queries(client, url):
+    from django.core.cache import cache
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21QueryBudget:
+
+    def test_01_lists_fit_budget_for_any_page_size(
+        self, admin_client, user_client, moderator_client, user, moderator,
+    ):
+        _, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client,
+        })
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        for url in (
+            '/api/v1/titles/',
+            f'{title_url}reviews/',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/',
+        ):
+            assert count_queries(user_client, f'{url}?limit=1') == (
+                count_queries(user_client, f'{url}?limit=50')
+            ), (
+                f'Проверьте, что число SQL-запросов к `{url}` не зависит '
+                'от размера страницы.'
+            )
+
+    def test_02_budget_exceeded_raises(self, admin_client, client,
+                                       monkeypatch):
+        from api.middleware import QueryBudgetExceeded
+        from api.v1.views import TitleViewSet
+
+        create_titles(admin_client)
+        monkeypatch.setattr(TitleViewSet, 'query_budget', {'list': 1})
+        with pytest.raises(QueryBudgetExceeded, match='бюджете 1'):
+            client.get('/api/v1/titles/')
+        assert client.post('/api/v1/titles/', data={}).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что бюджет проверяется только для своих действий.'
+
+    def test_03_budget_exceeded_is_logged(self, client, settings,
+                                          monkeypatch, caplog):
+        from api.v1.views import TitleViewSet
+        from django.test import Client
+
+        settings.QUERY_BUDGET_MODE = 'log'
+        monkeypatch.setattr(TitleViewSet, 'query_budget', 0)
+        with caplog.at_level(logging.ERROR, logger='api.middleware'):
+            response = Client().get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'бюджете 0' in caplog.text, (
+            'Проверьте, что при QUERY_BUDGET_MODE = "log" превышение '
+            'бюджета пишется в лог, а ответ отдаётся.'
+        )
@@ -0,0 +1,77 @@
+import re
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+
+from tests.utils import create_titles
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ServerTiming:
+
+    def test_01_server_timing_header(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        header = response.get('Server-Timing', '')
+        stages = dict(re.findall(r'(\w+);dur=([\d.]+)', header))
+        assert set(stages) == {'db', 'serialize', 'render', 'total'}, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` '
+            'с этапами db, serialize, render и total.'
+        )
+        assert float(stages['total']) >= max(
+            float(stages[stage]) for stage in ('db', 'serialize', 'render')
+        )
+        assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* queries"', header)
+
+    def test_02_route_histograms(self, admin_client, client):
+        from api.timing import BUCKETS_MS, get_histograms, reset_histograms
+
+        create_titles(admin_client)
+        reset_histograms()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/?year=1984')
+        histograms = get_histograms()
+        buckets, total, count = histograms[('api:title-list', 'total')]
+        assert count == 2 and sum(buckets) == 2, (
+            'Проверьте, что время запросов копится в гистограмме маршрута.'
+        )
+        assert len(buckets) == len(BUCKETS_MS) + 1 and total > 0
+        assert ('api:title-list', 'db') in histograms
+
+    def test_03_nested_timed_blocks(self, monkeypatch):
+        from api import timing
+
+        clock = FakeClock()
+        monkeypatch.setattr(
+            timing, 'time', SimpleNamespace(perf_counter=clock),
+        )
+        with timing.collect_timings() as timings:
+            with timing.timed('serialize'):
+                clock.now += 1
+                with timing.timed('serialize'):
+                    clock.now += 2
+                    timings.add_query(0.5)
+        assert timings.durations['serialize'] == 2.5, (
+            'Проверьте, что вложенные блоки не удваивают время, '
+            'а время базы вычитается.'
+        )
+        assert timings.durations['db'] == 0.5 and timings.queries == 1
+
+    def test_04_server_timing_disabled(self, settings):
+        from django.test import Client
+
+        settings.SERVER_TIMING = False
+        response = Client().get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' not in response
@@ -0,0 +1,146 @@
+import json
+import os
+import re
+import threading
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+SAMPLE = re.compile(r'^(\w+(?:\{.*\})?) (\S+)$')
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что эндпоинт `/metrics` доступен.'
+    )
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line.startswith('#'):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f'Строка `{line}` не в формате Prometheus.'
+        samples[match.group(1)] = float(match.group(2))
+    return samples
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Metrics:
+
+    def test_01_requests_and_durations(self, admin_client, client):
+        from api.metrics import registry
+
+        create_titles(admin_client)
+        registry.reset()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        samples = scrape(client)
+        assert samples[
+            'yamdb_http_requests_total{method="GET",route="api:title-list",'
+            'status="200"}'
+        ] == 2, 'Проверьте, что запросы считаются по маршруту и статусу.'
+        prefix = 'yamdb_request_duration_seconds'
+        labels = 'route="api:title-list",stage="total"'
+        assert samples[f'{prefix}_count{{{labels}}}'] == 2
+        assert samples[f'{prefix}_bucket{{{labels},le="+Inf"}}'] == 2, (
+            'Проверьте гистограмму времени маршрута.'
+        )
+        assert samples[f'{prefix}_sum{{{labels}}}'] > 0
+        assert samples[
+            'yamdb_db_queries_total{route="api:title-list"}'
+        ] > 0
+
+    def test_02_cache_and_email_counters(self, admin_client, client):
+        from api.metrics import registry
+
+        create_titles(admin_client)
+        registry.reset()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'metrics', 'email': 'metrics@yamdb.fake',
+        })
+        samples = scrape(client)
+        assert samples['yamdb_emails_total{result="queued"}'] == 1, (
+            'Проверьте счётчик писем, поставленных в очередь.'
+        )
+        call_command('sendemails', stdout=StringIO())
+        samples = scrape(client)
+        for result in ('hit', 'miss'):
+            assert samples[
+                'yamdb_cache_requests_total'
+                f'{{cache="response",result="{result}"}}'
+            ] == 1, 'Проверьте счётчики попаданий и промахов кеша ответов.'
+        assert samples['yamdb_emails_total{result="sent"}'] == 1, (
+            'Проверьте счётчик отправленных писем.'
+        )
+
+    def test_03_workers_are_merged(self, client, settings, tmp_path):
+        from api.metrics import registry
+
+        settings.METRICS_DIR = tmp_path
+        registry.reset()
+        (tmp_path / '1.json').write_text(json.dumps({
+            'counters': [[
+                'yamdb_import_rows_total',
+                [['model', 'reviews.review'], ['result', 'imported']],
+                5,
+            ]],
+            'histograms': [],
+        }))
+        registry.inc('yamdb_import_rows_total', {
+            'model': 'reviews.review', 'result': 'imported',
+        }, 3)
+        samples = scrape(client)
+        assert samples[
+            'yamdb_import_rows_total'
+            '{model="reviews.review",result="imported"}'
+        ] == 8, 'Проверьте, что /metrics складывает метрики всех воркеров.'
+        assert len(list(tmp_path.glob('*.json'))) == 2, (
+            'Проверьте, что процесс сбрасывает метрики в METRICS_DIR.'
+        )
+
+    def test_04_concurrent_flushes(self, settings, tmp_path):
+        from api.metrics import registry
+
+        settings.METRICS_DIR = tmp_path
+        registry.reset()
+        errors = []
+
+        def work():
+            try:
+                for _ in range(50):
+                    registry.inc('yamdb_emails_total', {'result': 'sent'})
+                    registry.flush(force=True)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, 'Проверьте, что сброс метрик потокобезопасен.'
+        assert [path.name for path in tmp_path.iterdir()] == [
+            f'{os.getpid()}.json',
+        ], 'Проверьте, что временные файлы сброса не остаются.'
+        snapshot = json.loads((tmp_path / f'{os.getpid()}.json').read_text())
+        assert snapshot['counters'][0][2] == 400
+
+    def test_05_flush_errors_do_not_break_requests(self, client, settings,
+                                                   tmp_path):
+        from api.metrics import registry
+
+        not_a_directory = tmp_path / 'metrics'
+        not_a_directory.write_text('')
+        settings.METRICS_DIR = not_a_directory
+        registry.reset()
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ошибка сброса метрик не ломает запрос.'
+        )
@@ -0,0 +1,66 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+def slow_queries(caplog):
+    return [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'api.slow_queries'
+    ]
+
+
+@pytest.fixture
+def slow_query_log(caplog, monkeypatch):
+    monkeypatch.setattr(
+        logging.getLogger('api.slow_queries'), 'propagate', True,
+    )
+    caplog.set_level(logging.WARNING, logger='api.slow_queries')
+    return caplog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SlowQueries:
+
+    def test_01_slow_queries_are_logged(self, admin_client, settings,
+                                        slow_query_log):
+        from django.test import Client
+
+        create_titles(admin_client)
+        settings.SLOW_QUERY_MS = 0
+        response = Client().get('/api/v1/titles/?year=1984')
+        assert response.status_code == HTTPStatus.OK
+        records = slow_queries(slow_query_log)
+        assert records, (
+            'Проверьте, что запросы дольше SLOW_QUERY_MS пишутся в лог '
+            '`api.slow_queries`.'
+        )
+        record = next(
+            record for record in records if 'reviews_title' in record['sql']
+        )
+        assert record['view'] == 'api:title-list'
+        assert record['method'] == 'GET'
+        assert record['duration_ms'] >= 0
+        assert 1984 in record['params'] or '1984' in record['params'], (
+            'Проверьте, что в записи есть параметры запроса.'
+        )
+        assert record['stack'] and all(
+            'site-packages' not in frame for frame in record['stack']
+        ), 'Проверьте, что стек содержит только кадры проекта.'
+        assert any('api/v1/' in frame for frame in record['stack'])
+
+    def test_02_threshold_and_disabled(self, settings, slow_query_log):
+        from django.test import Client
+
+        settings.SLOW_QUERY_MS = 10 ** 6
+        Client().get('/api/v1/categories/')
+        settings.SLOW_QUERY_MS = None
+        Client().get('/api/v1/categories/')
+        assert not slow_queries(slow_query_log), (
+            'Проверьте, что быстрые запросы не попадают в лог, '
+            'а при SLOW_QUERY_MS = None лог отключён.'
+        )
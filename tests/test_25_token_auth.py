@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+
+def token_client(user):
+    from api.v1.authentication import get_access_token
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}',
+    )
+    return client
+
+
+def user_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "user_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TokenAuth:
+
+    def test_01_token_contains_role_claims(self, client, admin):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        admin.confirmation_code = 'code'
+        admin.save()
+        response = client.post('/api/v1/auth/token/', data={
+            'username': admin.username, 'confirmation_code': 'code',
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['access'])
+        assert token['role'] == 'admin' and token['is_admin'] is True, (
+            'Проверьте, что access-токен содержит роль и признак '
+            'администратора.'
+        )
+
+    def test_02_permissions_without_user_lookup(self, admin_client, admin,
+                                                user):
+        titles, categories, _ = create_titles(admin_client)
+        admin_token_client = token_client(admin)
+        user_token_client = token_client(user)
+        with CaptureQueriesContext(connection) as captured:
+            response = user_token_client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert not user_queries(captured), (
+            'Проверьте, что аутентификация по токену не загружает '
+            'пользователя из базы.'
+        )
+        with CaptureQueriesContext(connection) as captured:
+            response = user_token_client.delete(
+                f'/api/v1/categories/{categories[0]["slug"]}/',
+            )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert not captured.captured_queries, (
+            'Проверьте, что права пользователя проверяются по токену.'
+        )
+        response = admin_token_client.delete(
+            f'/api/v1/categories/{categories[0]["slug"]}/',
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_03_author_is_loaded_when_needed(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_token_client = token_client(user)
+        response = user_token_client.post(url, data={
+            'text': 'Отзыв', 'score': 7,
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username, (
+            'Проверьте, что автор отзыва берётся из токена.'
+        )
+        review_url = f'{url}{response.json()["id"]}/'
+        response = user_token_client.patch(review_url, data={'score': 8})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор может изменить свой отзыв.'
+        )
+        user.delete()
+        response = user_token_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 7},
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя не позволяет '
+            'создавать объекты.'
+        )
+
+    def test_04_rename_keeps_token_bound_to_user(
+        self, user, django_user_model,
+    ):
+        user_token_client = token_client(user)
+        response = user_token_client.patch(
+            '/api/v1/users/me/', data={'username': 'renamed'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_token_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == 'renamed', (
+            'Проверьте, что после смены имени токен по-прежнему '
+            'указывает на того же пользователя.'
+        )
+        django_user_model.objects.create_user(
+            username=user.username, email='other@yamdb.fake',
+        )
+        response = user_token_client.get('/api/v1/users/me/')
+        assert response.json()['username'] == 'renamed', (
+            'Проверьте, что старый токен не даёт доступа к профилю '
+            'нового пользователя с прежним именем.'
+        )
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from rest_framework.test import APIClient
+
+
+def make_token(pk):
+    from api.v1.authentication import get_access_token
+    from user.models import User
+
+    return get_access_token(User(id=pk, username=f'user{pk}'))
+
+
+@pytest.fixture
+def token_cache(settings):
+    from api.v1.authentication import token_cache
+
+    settings.TOKEN_CACHE_SIZE = 2
+    token_cache.clear()
+    yield token_cache
+    token_cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TokenCache:
+
+    def test_01_repeated_token_is_cached(self, user, token_cache):
+        from api.metrics import registry
+        from api.v1.authentication import get_access_token
+
+        registry.reset()
+        token = str(get_access_token(user))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        for _ in range(3):
+            assert client.get('/api/v1/users/me/').status_code == (
+                HTTPStatus.OK
+            )
+        assert list(token_cache.tokens) == [token.encode()]
+        results = {
+            dict(labels)['result']: value
+            for (name, labels), value in registry.counters.items()
+            if name == 'yamdb_cache_requests_total'
+            and dict(labels)['cache'] == 'token'
+        }
+        assert results == {'miss': 1, 'hit': 2}, (
+            'Проверьте, что повторный токен берётся из кеша и попадания '
+            'считаются в метриках.'
+        )
+
+    def test_02_lru_eviction(self, token_cache):
+        tokens = [make_token(pk) for pk in range(1, 4)]
+        token_cache.set(b'1', tokens[0])
+        token_cache.set(b'2', tokens[1])
+        assert token_cache.get(b'1') is tokens[0]
+        token_cache.set(b'3', tokens[2])
+        assert token_cache.get(b'2') is None, (
+            'Проверьте, что при переполнении вытесняется давно '
+            'не использованный токен.'
+        )
+        assert token_cache.get(b'1') is tokens[0]
+        assert token_cache.get(b'3') is tokens[2]
+
+    def test_03_expired_token_is_dropped(self, token_cache, monkeypatch):
+        from api.v1 import authentication
+
+        token = make_token(1)
+        token_cache.set(b'1', token)
+        monkeypatch.setattr(authentication, 'time', SimpleNamespace(
+            time=lambda: token['exp'],
+        ))
+        assert token_cache.get(b'1') is None, (
+            'Проверьте, что токен не отдаётся из кеша после exp.'
+        )
+        assert not token_cache.tokens
+
+    def test_04_cache_disabled(self, user, settings, token_cache):
+        from api.v1.authentication import get_access_token
+
+        settings.TOKEN_CACHE_SIZE = 0
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}',
+        )
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        assert not token_cache.tokens
@@ -0,0 +1,199 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, считающий соединения как SMTP-бэкенд."""
+
+    opened = 0
+    connected = False
+
+    def open(self):
+        if self.connected:
+            return False
+        self.connected = True
+        CountingBackend.opened += 1
+        return True
+
+    def close(self):
+        self.connected = False
+
+
+class FailingBackend(EmailBackend):
+    """locmem-бэкенд, не отправляющий письма на адреса с fail."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any('fail' in address for address in message.to):
+                raise ConnectionError('Почтовый сервер недоступен')
+        return super().send_messages(messages)
+
+
+class UnreachableBackend(EmailBackend):
+    """locmem-бэкенд, не открывающий соединение."""
+
+    def open(self):
+        raise ConnectionRefusedError('Соединение отклонено')
+
+
+class DroppingBackend(FailingBackend):
+    """Бэкенд, у которого после ошибки отправки не открывается соединение."""
+
+    dropped = False
+
+    def send_messages(self, messages):
+        try:
+            return super().send_messages(messages)
+        except ConnectionError:
+            DroppingBackend.dropped = True
+            raise
+
+    def open(self):
+        if DroppingBackend.dropped:
+            raise ConnectionRefusedError('Соединение отклонено')
+        return super().open()
+
+
+def send_emails(*args):
+    stdout, stderr = StringIO(), StringIO()
+    call_command('sendemails', *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def queue_email(to):
+    from user.models import OutgoingEmail
+
+    return OutgoingEmail.objects.create(
+        subject='Тема', body='Текст', from_email='token@yamdb.ru', to=to,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27EmailOutbox:
+
+    def test_01_signup_queues_email(self, client):
+        from user.models import OutgoingEmail
+
+        outbox_before = len(mail.outbox)
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'outbox', 'email': 'outbox@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before, (
+            'Проверьте, что регистрация не отправляет письмо в запросе.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'outbox@yamdb.fake' and email.sent is None, (
+            'Проверьте, что регистрация ставит письмо в очередь.'
+        )
+        stdout, _ = send_emails()
+        assert 'Отправлено писем: 1. Ошибок: 0.' in stdout
+        assert len(mail.outbox) == outbox_before + 1
+        assert mail.outbox[-1].to == ['outbox@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent is not None, (
+            'Проверьте, что отправленное письмо отмечается в очереди.'
+        )
+        send_emails()
+        assert len(mail.outbox) == outbox_before + 1, (
+            'Проверьте, что письмо не отправляется повторно.'
+        )
+
+    def test_02_batches_share_connection(self, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_27_email_outbox.CountingBackend'
+        )
+        CountingBackend.opened = 0
+        outbox_before = len(mail.outbox)
+        for number in range(5):
+            queue_email(f'user{number}@yamdb.fake')
+        stdout, _ = send_emails('--batch-size', '2')
+        assert 'Отправлено писем: 5.' in stdout
+        assert len(mail.outbox) == outbox_before + 5
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачки отправляются через одно соединение.'
+        )
+
+    def test_03_failed_email_is_retried(self, settings):
+        from user.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_27_email_outbox.FailingBackend'
+        failing = queue_email('fail@yamdb.fake')
+        working = queue_email('ok@yamdb.fake')
+        stdout, stderr = send_emails('--max-attempts', '2')
+        assert 'Отправлено писем: 1. Ошибок: 1.' in stdout
+        failing.refresh_from_db()
+        working.refresh_from_db()
+        assert working.sent is not None
+        assert failing.sent is None and failing.attempts == 1, (
+            'Проверьте, что неотправленное письмо остаётся в очереди.'
+        )
+        assert failing.next_attempt > failing.created
+        assert 'Почтовый сервер недоступен' in failing.last_error
+        assert not stderr
+        stdout, _ = send_emails('--max-attempts', '2')
+        assert 'Отправлено писем: 0. Ошибок: 0.' in stdout, (
+            'Проверьте, что повтор ждёт задержку.'
+        )
+        OutgoingEmail.objects.filter(pk=failing.pk).update(
+            next_attempt=timezone.now(),
+        )
+        stdout, stderr = send_emails('--max-attempts', '2')
+        failing.refresh_from_db()
+        assert failing.attempts == 2
+        assert f'Письмо {failing.pk} не отправлено за 2 попыток' in stderr
+        stdout, _ = send_emails('--max-attempts', '2', '--retry-delay', '0')
+        assert 'Отправлено писем: 0. Ошибок: 0.' in stdout, (
+            'Проверьте, что после последней попытки письмо не отправляется.'
+        )
+
+    def test_04_unreachable_server(self, settings):
+        from user.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_27_email_outbox.UnreachableBackend'
+        )
+        emails = [queue_email(f'user{number}@yamdb.fake')
+                  for number in range(3)]
+        stdout, stderr = send_emails('--batch-size', '2')
+        assert 'Отправлено писем: 0. Ошибок: 2.' in stdout, (
+            'Проверьте, что без соединения письма пачки откладываются, '
+            'а команда завершается.'
+        )
+        assert 'Почтовый сервер недоступен' in stderr
+        attempts = [
+            email.attempts
+            for email in OutgoingEmail.objects.order_by('id')
+        ]
+        assert attempts == [1, 1, 0]
+        assert 'Соединение отклонено' in OutgoingEmail.objects.get(
+            pk=emails[0].pk,
+        ).last_error
+
+    def test_05_reconnect_failure(self, settings):
+        from user.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_27_email_outbox.DroppingBackend'
+        )
+        DroppingBackend.dropped = False
+        outbox_before = len(mail.outbox)
+        queue_email('ok@yamdb.fake')
+        queue_email('fail@yamdb.fake')
+        queue_email('next@yamdb.fake')
+        stdout, _ = send_emails()
+        assert 'Отправлено писем: 1. Ошибок: 2.' in stdout, (
+            'Проверьте, что ошибка повторного соединения не прерывает '
+            'команду.'
+        )
+        assert len(mail.outbox) == outbox_before + 1
+        assert list(
+            OutgoingEmail.objects.order_by('id')
+            .values_list('attempts', flat=True),
+        ) == [0, 1, 1]